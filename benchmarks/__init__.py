@@ -0,0 +1 @@
+""" Bolt11 benchmarks """
@@ -0,0 +1,119 @@
+""" decode(), validate(), to_json() and lnencode() benchmark suite
+
+usage: python -m benchmarks [--backend NAME] [--number N] [--json FILE] [--compare FILE]
+
+For every invoice shape it reports the best time per call out of several
+repeats, the peak traced memory during one call and the memory blocks and
+bytes the call leaves allocated (mostly its result). Blocks allocated and
+freed again during the call are not counted, tracemalloc only sees what is
+live; the peak shows their size. --json writes the results, --compare
+reports the change against results written before and exits with 1 on
+regressions.
+"""
+import argparse
+import json
+import sys
+import timeit
+import tracemalloc
+from typing import Callable, Dict, List
+
+from bolt11.decode import decode
+from bolt11.encode import lnencode
+from bolt11.signature import available_backends, set_backend
+from bolt11.validate import CHECKSUM, SYNTAX, validate
+
+from .vectors import PRIVKEY, spec_shapes, synthetic_shapes
+
+
+def measure(func: Callable, number: int, repeat: int) -> Dict[str, float]:
+    func()
+    seconds = min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    start = tracemalloc.get_traced_memory()[0]
+    result = func()
+    current, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    # net new blocks, not every allocation made during the call
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename"))
+    del result
+
+    return {
+        "us": seconds * 1e6,
+        "peak_kib": (peak - start) / 1024,
+        "retained_kib": (current - start) / 1024,
+        "retained_blocks": blocks,
+    }
+
+
+def run(number: int, repeat: int) -> Dict[str, Dict[str, float]]:
+    results = {}
+    for name, addr, invoice in spec_shapes() + synthetic_shapes():
+        results[f"decode/{name}"] = measure(lambda a=invoice: decode(a), number, repeat)
+        for level, label in ((SYNTAX, "syntax"), (CHECKSUM, "checksum")):
+            results[f"{label}/{name}"] = measure(
+                lambda a=invoice, level=level: validate(a, level), number, repeat
+            )
+        results[f"to_json/{name}"] = measure(decode(invoice).to_json, number, repeat)
+        if addr is not None:
+            results[f"encode/{name}"] = measure(
+                lambda a=addr: lnencode(a, PRIVKEY), number, repeat
+            )
+    return results
+
+
+def report(results: Dict[str, Dict[str, float]], baseline: Dict, threshold: float):
+    regressions: List[str] = []
+    print(
+        f"{'benchmark':<28} {'us/call':>10} {'peak KiB':>9} "
+        f"{'kept KiB':>8} {'kept blk':>8} {'change':>8}"
+    )
+    for name, result in results.items():
+        change = ""
+        if name in baseline:
+            ratio = result["us"] / baseline[name]["us"]
+            change = f"{ratio - 1:+.0%}"
+            if ratio > 1 + threshold:
+                regressions.append(name)
+        print(
+            f"{name:<28} {result['us']:10.1f} {result['peak_kib']:9.1f} "
+            f"{result['retained_kib']:8.1f} {result['retained_blocks']:8d} {change:>8}"
+        )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backend", choices=available_backends())
+    parser.add_argument("--number", type=int, default=20, help="calls per repeat")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="write the results to a file")
+    parser.add_argument("--compare", help="results to compare against")
+    parser.add_argument(
+        "--threshold", type=float, default=0.1, help="slowdown counted as regression"
+    )
+    args = parser.parse_args()
+
+    if args.backend:
+        set_backend(args.backend)
+    results = run(args.number, args.repeat)
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    regressions = report(results, baseline, args.threshold)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if regressions:
+        print(f"regressions: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
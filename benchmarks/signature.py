@@ -0,0 +1,31 @@
+""" benchmark decode() per signature backend
+
+usage: python -m benchmarks.signature [number]
+"""
+import sys
+import timeit
+
+from bolt11.decode import decode
+from bolt11.signature import available_backends, set_backend
+
+from .vectors import SPEC_VECTORS
+
+payment_request = dict(SPEC_VECTORS)["invoice_6"]
+
+
+def main(number: int = 200):
+    results = {}
+    for name in available_backends():
+        set_backend(name)
+        seconds = min(
+            timeit.repeat(lambda: decode(payment_request), number=number, repeat=5)
+        )
+        results[name] = seconds / number
+        print(f"{name:>10}: {results[name] * 1e6:10.1f} us/invoice")
+    baseline = results.pop("ecdsa")
+    for name, per_invoice in results.items():
+        print(f"{name:>10}: {baseline / per_invoice:10.1f}x faster than ecdsa")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,209 @@
+""" invoices the benchmarks run over
+
+the BOLT11 spec vectors and synthetic stress shapes, built deterministically
+with the spec test key.
+"""
+from typing import List, Optional, Tuple
+
+from secp256k1 import PrivateKey
+
+from bolt11.codec import CHARSET, bech32_encode
+from bolt11.decode import decode
+from bolt11.encode import lnencode
+from bolt11.helpers import bytes_to_u5, int_to_u5, u5_to_bytes
+from bolt11.models import Bolt11Invoice
+
+PRIVKEY = "e126f68f7eafcc8b74f54d269fe206be715000f94dac067d1c04a8ca3b2db734"
+# public key of PRIVKEY, the payee of the spec vectors
+PAYEE = "03e7156ae33b0a208d0744199163177e909e80176e55d97a2f221ede0f934dd9ad"
+DATE = 1496314658
+
+SPEC_VECTORS: List[Tuple[str, str]] = [
+    (
+        "invoice_1",
+        (
+            "lnbc1pvjluezsp5zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zygspp5qqqsyqcyq5rqwzqfqqqsyqcyq5rqwz"
+            "qfqqqsyqcyq5rqwzqfqypqdpl2pkx2ctnv5sxxmmwwd5kgetjypeh2ursdae8g6twvus8g6rfwvs8qun0dfjkxaq9qrsgq357wnc"
+            "5r2ueh7ck6q93dj32dlqnls087fxdwk8qakdyafkq3yap9us6v52vjjsrvywa6rt52cm9r9zqt8r2t7mlcwspyetp5h2tztugp9l"
+            "fyql"
+        ),
+    ),
+    (
+        "invoice_2",
+        (
+            "lnbc2500u1pvjluezsp5zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zygspp5qqqsyqcyq5rqwzqfqqqsyqcyq"
+            "5rqwzqfqqqsyqcyq5rqwzqfqypqdq5xysxxatsyp3k7enxv4jsxqzpu9qrsgquk0rl77nj30yxdy8j9vdx85fkpmdla2087ne0xh"
+            "8nhedh8w27kyke0lp53ut353s06fv3qfegext0eh0ymjpf39tuven09sam30g4vgpfna3rh"
+        ),
+    ),
+    (
+        "invoice_3",
+        (
+            "lnbc2500u1pvjluezsp5zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zygspp5qqqsyqcyq5rqwzqfqqqsyqcyq"
+            "5rqwzqfqqqsyqcyq5rqwzqfqypqdpquwpc4curk03c9wlrswe78q4eyqc7d8d0xqzpu9qrsgqhtjpauu9ur7fw2thcl4y9vfvh4m"
+            "9wlfyz2gem29g5ghe2aak2pm3ps8fdhtceqsaagty2vph7utlgj48u0ged6a337aewvraedendscp573dxr"
+        ),
+    ),
+    (
+        "invoice_4",
+        (
+            "lnbc20m1pvjluezsp5zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zygspp5qqqsyqcyq5rqwzqfqqqsyqcyq5r"
+            "qwzqfqqqsyqcyq5rqwzqfqypqhp58yjmdan79s6qqdhdzgynm4zwqd5d7xmw5fk98klysy043l2ahrqs9qrsgq7ea976txfraylv"
+            "gzuxs8kgcw23ezlrszfnh8r6qtfpr6cxga50aj6txm9rxrydzd06dfeawfk6swupvz4erwnyutnjq7x39ymw6j38gp7ynn44"
+        ),
+    ),
+    (
+        "invoice_5",
+        (
+            "lntb20m1pvjluezsp5zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zygshp58yjmdan79s6qqdhdzgynm4zwqd5"
+            "d7xmw5fk98klysy043l2ahrqspp5qqqsyqcyq5rqwzqfqqqsyqcyq5rqwzqfqqqsyqcyq5rqwzqfqypqfpp3x9et2e20v6pu37c5"
+            "d9vax37wxq72un989qrsgqdj545axuxtnfemtpwkc45hx9d2ft7x04mt8q7y6t0k2dge9e7h8kpy9p34ytyslj3yu569aalz2xdk"
+            "8xkd7ltxqld94u8h2esmsmacgpghe9k8"
+        ),
+    ),
+    (
+        "invoice_6",
+        (
+            "lnbc20m1pvjluezsp5zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zygspp5qqqsyqcyq5rqwzqfqqqsyqcyq5r"
+            "qwzqfqqqsyqcyq5rqwzqfqypqhp58yjmdan79s6qqdhdzgynm4zwqd5d7xmw5fk98klysy043l2ahrqsfpp3qjmp7lwpagxun9py"
+            "gexvgpjdc4jdj85fr9yq20q82gphp2nflc7jtzrcazrra7wwgzxqc8u7754cdlpfrmccae92qgzqvzq2ps8pqqqqqqpqqqqq9qqq"
+            "vpeuqafqxu92d8lr6fvg0r5gv0heeeqgcrqlnm6jhphu9y00rrhy4grqszsvpcgpy9qqqqqqgqqqqq7qqzq9qrsgqdfjcdk6w3ak"
+            "5pca9hwfwfh63zrrz06wwfya0ydlzpgzxkn5xagsqz7x9j4jwe7yj7vaf2k9lqsdk45kts2fd0fkr28am0u4w95tt2nsq76cqw0"
+        ),
+    ),
+    (
+        "invoice_7",
+        (
+            "lnbc20m1pvjluezsp5zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zygshp58yjmdan79s6qqdhdzgynm4zwqd5"
+            "d7xmw5fk98klysy043l2ahrqspp5qqqsyqcyq5rqwzqfqqqsyqcyq5rqwzqfqqqsyqcyq5rqwzqfqypqfppj3a24vwu6r8ejrss3"
+            "axul8rxldph2q7z99qrsgqz6qsgww34xlatfj6e3sngrwfy3ytkt29d2qttr8qz2mnedfqysuqypgqex4haa2h8fx3wnypranf3p"
+            "dwyluftwe680jjcfp438u82xqphf75ym"
+        ),
+    ),
+    (
+        "invoice_8",
+        (
+            "lnbc20m1pvjluezsp5zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zygshp58yjmdan79s6qqdhdzgynm4zwqd5"
+            "d7xmw5fk98klysy043l2ahrqspp5qqqsyqcyq5rqwzqfqqqsyqcyq5rqwzqfqqqsyqcyq5rqwzqfqypqfppqw508d6qejxtdg4y5"
+            "r3zarvary0c5xw7k9qrsgqt29a0wturnys2hhxpner2e3plp6jyj8qx7548zr2z7ptgjjc7hljm98xhjym0dg52sdrvqamxdezkm"
+            "qg4gdrvwwnf0kv2jdfnl4xatsqmrnsse"
+        ),
+    ),
+    (
+        "invoice_9",
+        (
+            "lnbc20m1pvjluezsp5zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zygshp58yjmdan79s6qqdhdzgynm4zwqd5"
+            "d7xmw5fk98klysy043l2ahrqspp5qqqsyqcyq5rqwzqfqqqsyqcyq5rqwzqfqqqsyqcyq5rqwzqfqypqfp4qrp33g0q5c5txsp9a"
+            "rysrx4k6zdkfs4nce4xj0gdcccefvpysxf3q9qrsgq9vlvyj8cqvq6ggvpwd53jncp9nwc47xlrsnenq2zp70fq83qlgesn4u3uy"
+            "f4tesfkkwwfg3qs54qe426hp3tz7z6sweqdjg05axsrjqp9yrrwc"
+        ),
+    ),
+    (
+        "invoice_10",
+        (
+            "lnbc9678785340p1pwmna7lpp5gc3xfm08u9qy06djf8dfflhugl6p7lgza6dsjxq454gxhj9t7a0sd8dgfkx7cmtwd68yetpd5s"
+            "9xar0wfjn5gpc8qhrsdfq24f5ggrxdaezqsnvda3kkum5wfjkzmfqf3jkgem9wgsyuctwdus9xgrcyqcjcgpzgfskx6eqf9hzqnt"
+            "eypzxz7fzypfhg6trddjhygrcyqezcgpzfysywmm5ypxxjemgw3hxjmn8yptk7untd9hxwg3q2d6xjcmtv4ezq7pqxgsxzmnyyqc"
+            "jqmt0wfjjq6t5v4khxsp5zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zygsxqyjw5qcqp2rzjq0gxwkzc8w632"
+            "3m55m4jyxcjwmy7stt9hwkwe2qxmy8zpsgg7jcuwz87fcqqeuqqqyqqqqlgqqqqn3qq9q9qrsgqrvgkpnmps664wgkp43l22qsgd"
+            "w4ve24aca4nymnxddlnp8vh9v2sdxlu5ywdxefsfvm0fq3sesf08uf6q9a2ke0hc9j6z6wlxg5z5kqpu2v9wz"
+        ),
+    ),
+]
+
+
+def encodable(invoice: Bolt11Invoice) -> Bolt11Invoice:
+    """the parts of a decoded invoice lnencode supports, as lnencode tags"""
+    addr = Bolt11Invoice()
+    addr.date = invoice.date
+    addr.currency = invoice.currency
+    addr.payment_hash = bytes.fromhex(invoice.payment_hash or "")  # type: ignore
+    tags: list = []
+    if invoice.description is not None:
+        tags.append(("d", invoice.description))
+    if invoice.description_hash is not None:
+        tags.append(("h", bytes.fromhex(invoice.description_hash)))
+    if invoice.expiry != 1000:
+        tags.append(("x", invoice.expiry))
+    if invoice.route_hints:
+        tags.append(("r", [_route(route) for route in invoice.route_hints]))
+    addr.tags = tags  # type: ignore
+    return addr
+
+
+def _route(route) -> tuple:
+    return (
+        route.pubkey_raw,
+        route.scid.to_bytes(8, "big"),
+        route.base_fee_msat,
+        route.ppm_fee,
+        route.cltv,
+    )
+
+
+def _hop(i: int) -> tuple:
+    pubkey = bytes([2]) + bytes((i * 7 + j) % 256 for j in range(32))
+    scid = (600_000 + i) << 40 | i << 16 | i % 4
+    return (pubkey, scid.to_bytes(8, "big"), 1000 + i, 100 + i, 40 + i)
+
+
+def _addr(tags: list) -> Bolt11Invoice:
+    addr = Bolt11Invoice()
+    addr.date = DATE
+    addr.payment_hash = bytes(range(32))  # type: ignore
+    addr.tags = tags  # type: ignore
+    return addr
+
+
+def _sign_u5(hrp: str, data: List[int]) -> str:
+    """sign 5-bit data the encoder can not produce, like unknown tags"""
+    privkey = PrivateKey(bytes.fromhex(PRIVKEY))
+    sig = privkey.ecdsa_sign_recoverable(hrp.encode() + u5_to_bytes(data))
+    sig, recid = privkey.ecdsa_recoverable_serialize(sig)
+    return bech32_encode(hrp, data + bytes_to_u5(sig + bytes([recid])))
+
+
+def _unknown_tags(count: int) -> str:
+    data = int_to_u5(DATE, 7)
+    # payment hash and description
+    data += [CHARSET.find("p"), 1, 20] + bytes_to_u5(bytes(range(32)))
+    data += [CHARSET.find("d"), 0, 2, 0, 0]
+    unknown = [c for c in CHARSET if c not in "psdhnxrf9"]
+    for i in range(count):
+        data += [CHARSET.find(unknown[i % len(unknown)]), 1, 20] + [i % 32] * 52
+    return _sign_u5("lnbc", data)
+
+
+def synthetic_shapes() -> List[Tuple[str, Optional[Bolt11Invoice], str]]:
+    """(name, lnencode input or None, invoice) for the stress shapes"""
+    shapes: List[Tuple[str, Optional[Bolt11Invoice]]] = [
+        # 6 route hints of 12 hops each, 12 hops fill a tag
+        (
+            "route_hints_72",
+            _addr(
+                [("d", "routes")]
+                + [("r", [_hop(i * 12 + j) for j in range(12)]) for i in range(6)]
+            ),
+        ),
+        # 639 bytes is the longest tagged field
+        ("description_639", _addr([("d", "x" * 639)])),
+        (
+            "fallbacks_3",
+            _addr(
+                [
+                    ("d", "fallbacks"),
+                    ("f", "1RustyRX2oai4EYYDpQGWvEL62BBGqN9T"),
+                    ("f", "3EktnHQD7RiAE6uzMj2ZifT9YgRrkSgzQX"),
+                    ("f", "bc1qw508d6qejxtdg4y5r3zarvary0c5xw7kv8f3t4"),
+                ]
+            ),
+        ),
+    ]
+    ret = [(name, addr, lnencode(addr, PRIVKEY)) for name, addr in shapes if addr]
+    ret.append(("unknown_tags_40", None, _unknown_tags(40)))
+    return ret
+
+
+def spec_shapes() -> List[Tuple[str, Optional[Bolt11Invoice], str]]:
+    """(name, lnencode input, invoice) for the spec vectors"""
+    return [(name, encodable(decode(a)), a) for name, a in SPEC_VECTORS]
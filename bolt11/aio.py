@@ -0,0 +1,124 @@
+""" Bolt11 asyncio API """
+import asyncio
+from concurrent.futures import Executor
+from functools import partial
+from typing import (
+    AsyncIterator,
+    Callable,
+    Iterable,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+)
+from weakref import WeakKeyDictionary
+
+from .decode import decode
+from .encode import lnencode
+from .models import Bolt11Invoice
+
+T = TypeVar("T")
+
+
+class AsyncCodec:
+    """
+    Run decode() and lnencode() on `executor` (the loop's default executor if
+    None), at most `concurrency` calls at a time. Calls waiting for a slot are
+    never submitted if they get cancelled. Pass a ProcessPoolExecutor to use
+    more than one core.
+    """
+
+    def __init__(
+        self, executor: Optional[Executor] = None, concurrency: Optional[int] = None
+    ):
+        self.executor = executor
+        self.concurrency = concurrency
+        # one semaphore per event loop, a semaphore is bound to its loop
+        self._semaphores: WeakKeyDictionary[
+            asyncio.AbstractEventLoop, asyncio.Semaphore
+        ] = WeakKeyDictionary()
+
+    async def _run(self, func: Callable[..., T], *args) -> T:
+        loop = asyncio.get_running_loop()
+        if not self.concurrency:
+            return await loop.run_in_executor(self.executor, partial(func, *args))
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.concurrency)
+        async with semaphore:
+            return await loop.run_in_executor(self.executor, partial(func, *args))
+
+    async def decode(self, a: str) -> Bolt11Invoice:
+        return await self._run(decode, a)
+
+    async def lnencode(self, addr: Bolt11Invoice, privkey_hex: str) -> str:
+        return await self._run(lnencode, addr, privkey_hex)
+
+    async def decode_iter(
+        self, invoices: Iterable[str], window: Optional[int] = None
+    ) -> AsyncIterator[Tuple[int, Union[Bolt11Invoice, Exception]]]:
+        """
+        decode invoices, yielding (index, invoice or exception) in the order
+        they finish. at most `window` (default: concurrency, or 64) invoices
+        are in flight, pending work is cancelled when the iteration stops.
+        """
+        window = window or self.concurrency or 64
+        pending: Set[asyncio.Future] = set()
+        indexed = enumerate(invoices)
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and len(pending) < window:
+                    item = next(indexed, None)
+                    if item is None:
+                        exhausted = True
+                        break
+                    pending.add(asyncio.ensure_future(self._indexed(*item)))
+                if not pending:
+                    return
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _indexed(
+        self, index: int, a: str
+    ) -> Tuple[int, Union[Bolt11Invoice, Exception]]:
+        try:
+            return index, await self.decode(a)
+        except Exception as exc:  # pylint: disable=broad-except
+            return index, exc
+
+
+_codec = AsyncCodec()
+
+
+def configure(
+    executor: Optional[Executor] = None, concurrency: Optional[int] = None
+) -> AsyncCodec:
+    """set the executor and concurrency limit of the module level coroutines"""
+    global _codec  # pylint: disable=global-statement
+    _codec = AsyncCodec(executor, concurrency)
+    return _codec
+
+
+async def async_decode(a: str) -> Bolt11Invoice:
+    """decode() without blocking the event loop"""
+    return await _codec.decode(a)
+
+
+async def async_lnencode(addr: Bolt11Invoice, privkey_hex: str) -> str:
+    """lnencode() without blocking the event loop"""
+    return await _codec.lnencode(addr, privkey_hex)
+
+
+def async_decode_iter(
+    invoices: Iterable[str], window: Optional[int] = None
+) -> AsyncIterator[Tuple[int, Union[Bolt11Invoice, Exception]]]:
+    """decode invoices, yielding (index, invoice or exception) as they finish"""
+    return _codec.decode_iter(invoices, window)
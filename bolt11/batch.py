@@ -0,0 +1,170 @@
+""" Bolt11 batch decoding with NumPy """
+from functools import lru_cache
+from itertools import islice
+from typing import Any, Iterable, List, Optional, Sequence, Tuple, Union
+
+from .codec import POLYMOD_TABLE, REVERSE_TABLE, bech32_polymod, hrp_polymod
+from .decode import InvoiceInput, _decode_or_exception, decode_split, split_data
+from .exceptions import Bolt11BadBech32StringException
+from .models import Bolt11Invoice
+
+try:
+    import numpy as np
+except ImportError as err:  # pragma: no cover
+    raise ImportError("bolt11.batch needs numpy: pip install bolt11[numpy]") from err
+
+_POLYMOD = np.array(POLYMOD_TABLE, dtype=np.uint32)
+
+# character classes of every byte, one lookup for all checks. NUL is the
+# padding of the rows and has none.
+_UNPRINTABLE, _UPPER, _LOWERCASE, _NOT_CHARSET, _SEPARATOR = 1, 2, 4, 8, 16
+_FLAGS = bytes(
+    0
+    if c == 0
+    else (_UNPRINTABLE if not 33 <= c <= 126 else 0)
+    | (_UPPER if 65 <= c <= 90 else 0)
+    | (_LOWERCASE if 97 <= c <= 122 else 0)
+    | (_NOT_CHARSET if REVERSE_TABLE[c] == 255 else 0)
+    | (_SEPARATOR if c == ord("1") else 0)
+    for c in range(256)
+)
+
+# checksums of the human readable parts seen, they repeat a lot
+_hrp_polymod = lru_cache(maxsize=1024)(hrp_polymod)
+
+
+@lru_cache(maxsize=64)
+def _padded_checksums(width: int):
+    """
+    checksum of valid data followed by 0 to `width` zeros. padding is
+    checked against it instead of masking every row in the checksum loop.
+    """
+    checksums = [1]
+    for _ in range(width):
+        checksums.append(bech32_polymod(b"\0", checksums[-1]))
+    return np.array(checksums, dtype=np.uint32)
+
+
+def _byte_matrix(invoices: Sequence[InvoiceInput]):
+    """invoices as a zero padded (rows, width) uint8 matrix and their lengths,
+    -1 for invoices that are not ascii"""
+    try:
+        raw = np.asarray(invoices)
+        if raw.ndim != 1 or raw.dtype.kind not in "US":
+            raise TypeError(raw.dtype)
+        raw = raw.astype(np.bytes_)
+        lengths = np.fromiter(map(len, invoices), dtype=np.int64, count=len(invoices))
+    except (TypeError, ValueError):
+        items: List[Any] = [
+            bytes(a, "ascii") if isinstance(a, str) and a.isascii() else a
+            for a in invoices
+        ]
+        ok = [isinstance(a, (bytes, bytearray, memoryview)) for a in items]
+        raw = np.array([bytes(a) if good else b"" for a, good in zip(items, ok)])
+        lengths = np.array(
+            [len(a) if good else -1 for a, good in zip(items, ok)], dtype=np.int64
+        )
+    width = max(raw.dtype.itemsize, 1)
+    matrix = raw.astype(f"S{width}").view(np.uint8).reshape(len(invoices), width)
+    # bytes arrays drop trailing NULs, those invoices are invalid anyway
+    lengths[np.char.str_len(raw) != lengths] = -1
+    return matrix, lengths
+
+
+def bech32_decode_array(
+    invoices: Sequence[InvoiceInput],
+) -> Tuple[List[Optional[str]], List[Optional[bytes]]]:
+    """
+    bech32_decode() for many invoices at once, checking the characters and
+    checksums of all rows with array operations. returns the human readable
+    parts and the 5-bit data (one value per byte), None for invalid invoices.
+    """
+    if not len(invoices):  # pylint: disable=use-implicit-booleaness-not-len
+        return [], []
+    return _bech32_decode_matrix(*_byte_matrix(invoices))
+
+
+def _bech32_decode_matrix(
+    matrix, lengths
+) -> Tuple[List[Optional[str]], List[Optional[bytes]]]:
+    count, width = matrix.shape
+    raw = matrix.tobytes()
+    flags = np.frombuffer(raw.translate(_FLAGS), dtype=np.uint8).reshape(count, width)
+
+    row_flags = np.bitwise_or.reduce(flags, axis=1)
+    valid = (lengths >= 0) & ((row_flags & _UNPRINTABLE) == 0)
+    valid &= (row_flags & (_UPPER | _LOWERCASE)) != (_UPPER | _LOWERCASE)
+    # the only NULs are the padding
+    valid &= np.count_nonzero(matrix, axis=1) == lengths
+
+    # position of the last separator, no invalid characters after it
+    ones = (flags & _SEPARATOR) != 0
+    sep = width - 1 - np.argmax(ones[:, ::-1], axis=1)
+    valid &= ones.any(axis=1) & (sep >= 1) & (sep + 7 <= lengths)
+    bad = (flags & _NOT_CHARSET) != 0
+    valid &= ~bad.any(axis=1) | (width - 1 - np.argmax(bad[:, ::-1], axis=1) <= sep)
+
+    # 5-bit values of the data parts, left aligned in a zero padded matrix
+    values = raw.translate(REVERSE_TABLE)
+    hrps: List[Optional[str]] = []
+    data: List[bytes] = []
+    checksums = []
+    rows = zip(valid.tolist(), sep.tolist(), lengths.tolist())
+    for offset, (ok, start, end) in zip(range(0, len(raw), width), rows):
+        if ok:
+            hrp = raw[offset : offset + start].lower()
+            hrps.append(hrp.decode())
+            data.append(values[offset + start + 1 : offset + end])
+            checksums.append(_hrp_polymod(hrp))
+        else:
+            hrps.append(None)
+            data.append(b"")
+            checksums.append(1)
+    data_lengths = np.fromiter(map(len, data), dtype=np.int64, count=count)
+    data_width = int(data_lengths.max())
+    columns = np.frombuffer(
+        b"".join(d.ljust(data_width, b"\0") for d in data), dtype=np.uint8
+    ).reshape(count, data_width)
+
+    # checksum of all invoices, one column at a time
+    chk = np.array(checksums, dtype=np.uint32)
+    for column in np.ascontiguousarray(columns.T):
+        chk = _POLYMOD[chk >> 25] ^ (chk & 0x1FFFFFF) << 5 ^ column
+    valid &= chk == _padded_checksums(data_width)[data_width - data_lengths]
+
+    oks = valid.tolist()
+    return (
+        [hrp if ok else None for hrp, ok in zip(hrps, oks)],
+        [d[:-6] if ok else None for d, ok in zip(data, oks)],
+    )
+
+
+def decode_array(
+    invoices: Iterable[InvoiceInput], chunksize: int = 16384
+) -> List[Union[Bolt11Invoice, Exception]]:
+    """
+    decode many invoices, validating and unpacking `chunksize` invoices at a
+    time with bech32_decode_array(). results match decode(), a failing
+    invoice returns its exception instead of an invoice.
+    """
+    results: List[Union[Bolt11Invoice, Exception]] = []
+    invoices = iter(invoices)
+    while True:
+        chunk = list(islice(invoices, chunksize))
+        if not chunk:
+            return results
+        matrix, lengths = _byte_matrix(chunk)
+        hrps, values = _bech32_decode_matrix(matrix, lengths)
+        for a, length, hrp, data in zip(chunk, lengths, hrps, values):
+            if hrp is None or data is None:
+                # anything that is not plain ascii gets the error decode() raises
+                results.append(
+                    _decode_or_exception(a)
+                    if length < 0
+                    else Bolt11BadBech32StringException()
+                )
+                continue
+            try:
+                results.append(decode_split(*split_data(hrp, data)))
+            except Exception as exc:  # pylint: disable=broad-except
+                results.append(exc)
@@ -0,0 +1,95 @@
+""" Bolt11 decode cache """
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable, Dict, Tuple
+
+from . import metrics
+from .decode import decode
+from .models import Bolt11Invoice
+
+
+class DecodeCache:
+    """
+    Thread-safe LRU cache of decoded invoices, keyed by the invoice string.
+    Entries drop out once the invoice expired (date + expiry). Cached invoices
+    are shared between callers and must not be modified.
+    """
+
+    def __init__(self, maxsize: int = 1024, clock: Callable[[], float] = time.time):
+        self.maxsize = maxsize
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self._invoices: OrderedDict[str, Tuple[Bolt11Invoice, int]] = OrderedDict()
+        self._lock = Lock()
+
+    def decode(self, a: str) -> Bolt11Invoice:
+        """decode(), returning the cached invoice for a repeated string"""
+        now = self.clock()
+        recorder = metrics.current
+        with self._lock:
+            entry = self._invoices.get(a)
+            if entry is not None:
+                invoice, expires_at = entry
+                if expires_at > now:
+                    self._invoices.move_to_end(a)
+                    self.hits += 1
+                    if recorder is not None:
+                        recorder.count("decode_cache_hit")
+                    return invoice
+                del self._invoices[a]
+                self.expired += 1
+            self.misses += 1
+        if recorder is not None:
+            recorder.count("decode_cache_miss")
+
+        invoice = decode(a)
+        expires_at = invoice.date + invoice.expiry
+        if expires_at > now:
+            with self._lock:
+                self._invoices[a] = (invoice, expires_at)
+                self._invoices.move_to_end(a)
+                while len(self._invoices) > self.maxsize:
+                    self._invoices.popitem(last=False)
+                    self.evictions += 1
+        return invoice
+
+    def purge(self) -> int:
+        """drop all expired entries, returns how many were dropped"""
+        now = self.clock()
+        with self._lock:
+            expired = [
+                a for a, (_, expires_at) in self._invoices.items() if expires_at <= now
+            ]
+            for a in expired:
+                del self._invoices[a]
+            self.expired += len(expired)
+        return len(expired)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._invoices.clear()
+            self.hits = 0
+            self.misses = 0
+            self.expired = 0
+            self.evictions = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "evictions": self.evictions,
+            "size": len(self._invoices),
+            "maxsize": self.maxsize,
+        }
+
+    def __contains__(self, a: str) -> bool:
+        entry = self._invoices.get(a)
+        return entry is not None and entry[1] > self.clock()
+
+    def __len__(self) -> int:
+        return len(self._invoices)
@@ -1,10 +1,10 @@
 """ lnurl CLI """
 import sys
+from collections import deque
+from typing import Deque, Iterator, Optional, TextIO
 
 import click
 
-from .decode import decode as bolt11_decode
-
 # disable tracebacks on exceptions
 sys.tracebacklimit = 0
 
@@ -26,18 +26,133 @@ def encode(url):
 
 
 @click.command()
-@click.argument("bolt11", type=str)
-def decode(bolt11):
+@click.argument("bolt11", type=str, required=False)
+@click.option(
+    "--file",
+    "-f",
+    "infile",
+    type=click.File("r"),
+    help="read newline-delimited invoices from a file",
+)
+@click.option(
+    "--workers",
+    "-w",
+    type=int,
+    default=1,
+    show_default=True,
+    help="number of decoding processes for newline-delimited input",
+)
+@click.option("--chunksize", type=int, default=64, show_default=True)
+def decode(
+    bolt11: Optional[str], infile: Optional[TextIO], workers: int, chunksize: int
+):
+    """
+    decode a bolt11 invoice, or newline-delimited invoices from stdin (-) or
+    --file into one JSON object per line
+    """
+    import json
+
+    from .decode import decode as bolt11_decode
+    from .decode import decode_iter
+
+    if infile is None and bolt11 == "-":
+        infile = sys.stdin
+    if infile is None:
+        if bolt11 is None:
+            raise click.UsageError("missing BOLT11 argument, - or --file")
+        click.echo(bolt11_decode(bolt11).to_json())
+        return
+
+    # line numbers of the invoices read ahead, results come back in order
+    linenos: Deque[int] = deque()
+
+    def invoices(stream: TextIO) -> Iterator[str]:
+        for lineno, line in enumerate(stream, 1):
+            line = line.strip()
+            if line:
+                linenos.append(lineno)
+                yield line
+
+    for invoice in decode_iter(invoices(infile), workers, chunksize):
+        lineno = linenos.popleft()
+        if isinstance(invoice, Exception):
+            record = {
+                "line": lineno,
+                "error": type(invoice).__name__,
+                "message": str(invoice),
+            }
+            click.echo(json.dumps(record))
+        else:
+            click.echo(invoice.to_json())
+
+
+@click.command()
+@click.option("--unix", "path", type=click.Path(), help="listen on a Unix socket")
+@click.option(
+    "--host",
+    default="127.0.0.1",
+    show_default=True,
+    help="loopback address for --port, others need --public",
+)
+@click.option("--port", type=int, help="listen on TCP, 0 for any free port")
+@click.option(
+    "--workers",
+    "-w",
+    type=int,
+    help="number of pre-forked worker processes  [default: one per cpu]",
+)
+@click.option(
+    "--framing",
+    type=click.Choice(["ndjson", "length"]),
+    default="ndjson",
+    show_default=True,
+    help="JSON lines, or JSON preceded by a 4 byte big-endian length",
+)
+@click.option(
+    "--privkey",
+    envvar="BOLT11_PRIVKEY",
+    help="key for encode requests without one, or BOLT11_PRIVKEY",
+)
+@click.option(
+    "--public",
+    is_flag=True,
+    help="allow a --host that is not a loopback address",
+)
+def serve(
+    *,
+    path: Optional[str],
+    host: str,
+    port: Optional[int],
+    public: bool,
+    workers: Optional[int],
+    framing: str,
+    privkey: Optional[str],
+):
     """
-    decode a bolt11 invoice
+    answer decode and encode requests on a Unix socket or TCP, pipelined on
+    keep-alive connections
     """
-    click.echo(bolt11_decode(bolt11))
+    from .server import is_loopback, listen
+    from .server import serve as bolt11_serve
+
+    if path is not None and port is None:
+        listener = listen(path)
+    elif port is not None and path is None:
+        if not public and not is_loopback(host):
+            # anyone who can connect can have invoices signed with --privkey
+            raise click.UsageError(f"{host} is not a loopback address, see --public")
+        listener = listen((host, port))
+    else:
+        raise click.UsageError("one of --unix or --port is required")
+    click.echo(f"listening on {listener.getsockname()}", err=True)
+    bolt11_serve(listener, workers, framing, privkey)
 
 
 def main():
     """main function"""
     command_group.add_command(encode)
     command_group.add_command(decode)
+    command_group.add_command(serve)
     command_group()
 
 
@@ -0,0 +1,94 @@
+""" Bolt11 bech32 codec """
+import re
+from functools import reduce
+from operator import xor
+from typing import Iterable, Optional, Sequence, Tuple, Union
+
+from .exceptions import Bolt11BadBech32StringException
+
+CHARSET = "qpzry9x8gf2tvdw0s3jn54khce6mua7l"
+
+# 5-bit value of every byte, lower or upper case, 255 if not in the charset
+REVERSE_TABLE = bytes(
+    CHARSET.find(chr(c).lower()) if chr(c).lower() in CHARSET else 255
+    for c in range(256)
+)
+# charset byte of every 5-bit value, for bytes.translate
+_FORWARD = CHARSET.encode() + bytes(256 - len(CHARSET))
+
+_PRINTABLE = re.compile(rb"[\x21-\x7e]+")
+
+_GENERATOR = (0x3B6A57B2, 0x26508E6D, 0x1EA119FA, 0x3D4233DD, 0x2A1462B3)
+# xor of the generators selected by the top 5 bits of the checksum
+POLYMOD_TABLE = tuple(
+    reduce(xor, (g for i, g in enumerate(_GENERATOR) if top >> i & 1), 0)
+    for top in range(32)
+)
+
+
+def bech32_polymod(values: Iterable[int], chk: int = 1) -> int:
+    """bech32 checksum of 5-bit values, continuing from `chk`"""
+    for value in values:
+        chk = POLYMOD_TABLE[chk >> 25] ^ (chk & 0x1FFFFFF) << 5 ^ value
+    return chk
+
+
+def hrp_polymod(hrp: bytes) -> int:
+    """bech32 checksum of the expanded human readable part"""
+    return bech32_polymod(
+        bytes([0, *(c & 31 for c in hrp)]), bech32_polymod(b >> 5 for b in hrp)
+    )
+
+
+def bech32_split(
+    bech: Union[str, bytes, bytearray, memoryview]
+) -> Optional[Tuple[bytes, bytes]]:
+    """
+    lowercase human readable part and 5-bit values (checksum included) of a
+    well formed bech32 string, None if it is not one. the checksum is not
+    verified.
+    """
+    if isinstance(bech, str):
+        raw = bech.encode() if bech.isascii() else b""
+    elif isinstance(bech, (bytes, bytearray, memoryview)):
+        # not bytes() of anything else, bytes(n) allocates n zero bytes
+        try:
+            raw = bytes(bech)
+        except (TypeError, ValueError):
+            return None
+    else:
+        return None
+
+    lower = raw.lower()
+    pos = lower.rfind(b"1")
+    if (
+        not _PRINTABLE.fullmatch(raw)
+        or (lower != raw and raw.upper() != raw)
+        or pos < 1
+        or pos + 7 > len(lower)
+    ):
+        return None
+
+    data = lower[pos + 1 :].translate(REVERSE_TABLE)
+    return None if b"\xff" in data else (lower[:pos], data)
+
+
+def bech32_decode(bech: Union[str, bytes, bytearray, memoryview]) -> Tuple[str, bytes]:
+    """
+    validate a bech32 string of any length, returning the human readable part
+    and the data without checksum as one 5-bit value per byte
+    """
+    parts = bech32_split(bech)
+    if parts is None or bech32_polymod(parts[1], hrp_polymod(parts[0])) != 1:
+        raise Bolt11BadBech32StringException()
+    hrp, data = parts
+    return hrp.decode(), data[:-6]
+
+
+def bech32_encode(hrp: str, data: Sequence[int]) -> str:
+    """bech32 string of the human readable part and 5-bit values"""
+    polymod = (
+        bech32_polymod(bytes(6), bech32_polymod(data, hrp_polymod(hrp.encode()))) ^ 1
+    )
+    checksum = [(polymod >> 5 * (5 - i)) & 31 for i in range(6)]
+    return hrp + "1" + bytes([*data, *checksum]).translate(_FORWARD).decode()
@@ -0,0 +1,157 @@
+""" Bolt11 columnar decoding """
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .decode import (
+    InvoiceInput,
+    check_signature,
+    parse_amount,
+    parse_tagdata,
+    split_invoice,
+)
+from .helpers import u5_to_bytes, u5_to_int
+from .models import DEFAULT_CURRENCY, DEFAULT_EXPIRY, ROUTE_HINT
+
+# currency, amount, date, expiry, route hint hops, payee, payment hash
+Row = Tuple[str, int, int, int, int, bytes, bytes]
+_EMPTY_ROW: Row = (DEFAULT_CURRENCY, 0, 0, 0, 0, bytes(33), bytes(32))
+_INT64 = 1 << 63
+
+
+class InvoiceColumns:
+    """
+    Decoded invoices as columns, one row per invoice: amount (msat, 0 if
+    there is none), date, expiry and route hint hops in array.array columns,
+    payee and payment_hash as fixed width bytes (33 and 32 bytes per row) and
+    currency as an index into `currencies`. Rows of invoices that failed have
+    `valid` 0, zeroed fields and their exception in `errors`.
+    """
+
+    __slots__ = (
+        "valid",
+        "amount",
+        "date",
+        "expiry",
+        "route_hints",
+        "currency",
+        "currencies",
+        "payee",
+        "payment_hash",
+        "errors",
+        "_codes",
+    )
+
+    def __init__(self) -> None:
+        self.valid = array("B")
+        self.amount = array("q")
+        self.date = array("q")
+        self.expiry = array("q")
+        self.route_hints = array("L")
+        self.currency = array("H")
+        self.currencies: List[str] = []
+        self.payee = bytearray()
+        self.payment_hash = bytearray()
+        self.errors: Dict[int, Exception] = {}
+        self._codes: Dict[str, int] = {}
+
+    def append(self, a: InvoiceInput) -> None:
+        """decode an invoice into a new row"""
+        valid = 1
+        try:
+            row = _decode_row(a)
+        except Exception as exc:  # pylint: disable=broad-except
+            self.errors[len(self)] = exc
+            row, valid = _EMPTY_ROW, 0
+        currency, amount, date, expiry, hops, payee, payment_hash = row
+        code = self._codes.get(currency)
+        if code is None:
+            code = self._codes[currency] = len(self.currencies)
+            self.currencies.append(currency)
+
+        self.valid.append(valid)
+        self.currency.append(code)
+        self.amount.append(amount)
+        self.date.append(date)
+        self.expiry.append(expiry)
+        self.route_hints.append(hops)
+        self.payee += payee
+        self.payment_hash += payment_hash
+
+    def extend(self, invoices: Iterable[InvoiceInput]) -> None:
+        for a in invoices:
+            self.append(a)
+
+    def to_numpy(self) -> Dict[str, Any]:
+        """
+        the columns as NumPy arrays, numbers and hashes sharing the buffers
+        (no appending while they are alive), currency as strings
+        """
+        import numpy as np
+
+        return {
+            "valid": np.frombuffer(self.valid, dtype=np.bool_),
+            "currency": np.array(self.currencies or [""])[
+                np.frombuffer(self.currency, dtype=self.currency.typecode)
+            ],
+            **{
+                name: np.frombuffer(column, dtype=column.typecode)
+                for name, column in (
+                    ("amount", self.amount),
+                    ("date", self.date),
+                    ("expiry", self.expiry),
+                    ("route_hints", self.route_hints),
+                )
+            },
+            "payee": np.frombuffer(self.payee, dtype="S33"),
+            "payment_hash": np.frombuffer(self.payment_hash, dtype="S32"),
+        }
+
+    def __len__(self) -> int:
+        return len(self.valid)
+
+
+def decode_columns(invoices: Iterable[InvoiceInput]) -> InvoiceColumns:
+    """
+    decode invoices straight into columns, without an invoice object per
+    invoice. only the tags needed for the columns are parsed, the signature
+    is checked like decode() does.
+    """
+    columns = InvoiceColumns()
+    columns.extend(invoices)
+    return columns
+
+
+def _decode_row(a: InvoiceInput) -> Row:
+    hrp, data, signature = split_invoice(a)
+    currency, amount = parse_amount(hrp)
+    expiry = DEFAULT_EXPIRY
+    hops = 0
+    payee: Optional[bytes] = None
+    payment_hash = bytes(32)
+
+    pos = 7
+    while pos != len(data):
+        tag, tagdata, data_length = parse_tagdata(data, pos)
+        pos += 3 + data_length
+        if tag == "p" and data_length == 52:
+            payment_hash = u5_to_bytes(tagdata, pad=False)
+        elif tag == "x":
+            expiry = u5_to_int(tagdata)
+        elif tag == "r":
+            hops += data_length * 5 // 8 // ROUTE_HINT.size
+        elif tag == "n":
+            payee = u5_to_bytes(tagdata, pad=False)
+
+    payee = check_signature(hrp, data, signature, payee)
+    amount = amount or 0
+    if amount >= _INT64 or expiry >= _INT64:
+        raise OverflowError("amount or expiry exceeds 64 bits")
+    return (
+        currency or DEFAULT_CURRENCY,
+        amount,
+        u5_to_int(data[:7]),
+        expiry,
+        hops,
+        payee,
+        payment_hash,
+    )
@@ -1,52 +1,65 @@
 """ Bolt11 Invoice Decoder """
 
+import os
 import re
-from hashlib import sha256
-from typing import List, Optional
-
-from bech32 import CHARSET, bech32_decode
-from bitstring import Bits, ConstBitStream
-from ecdsa import SECP256k1, VerifyingKey
-from ecdsa.util import sigdecode_string
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence, Union
 
+from . import metrics
+from .codec import CHARSET, bech32_decode
 from .exceptions import (
-    Bolt11BadBech32StringException,
+    Bolt11MalformedTagException,
     Bolt11NoSignatureException,
+    Bolt11SignatureVerifyException,
     Bolt11StartWithLnException,
 )
 from .fallback import parse_fallback
-from .helpers import readable_scid, trim_to_bytes, u5_to_bitarray, unshorten_amount
-from .models import Bolt11Invoice, Route
+from .helpers import u5_to_bytes, u5_to_int, unshorten_amount
+from .models import Bolt11Invoice, Route, RouteHintTable
+from .signature import backends, get_backend, set_backend
+
+# invoice as text, or its ascii bytes (for example read from a socket or mmap)
+InvoiceInput = Union[str, bytes, bytearray, memoryview]
 
 
-def decode(a: str) -> Bolt11Invoice:
+def decode(a: InvoiceInput) -> Bolt11Invoice:
     """Bolt11 decode function"""
+    recorder = metrics.current
+    if recorder is not None:
+        return _decode_measured(a, recorder)
+    return decode_split(*split_invoice(a))
+
 
+def _decode_measured(a: InvoiceInput, recorder: metrics.Metrics) -> Bolt11Invoice:
+    watch = metrics.Stopwatch()
     try:
-        hrp, decoded_data = bech32_decode(a)
+        hrp, decoded = bech32_decode(a)
+        watch.lap("bech32")
+        hrp, data, signature = split_data(hrp, decoded)
+        watch.lap("unpack")
+        invoice = parse_split(hrp, data, signature)
+        watch.lap("tags")
+        recorder.count("signature_verify" if invoice.payee_raw else "signature_recover")
+        invoice.payee = check_signature(hrp, data, signature, invoice.payee_raw)
+        watch.lap("signature")
     except Exception as exc:
-        raise Bolt11BadBech32StringException() from exc
-
-    if hrp is None or decoded_data is None:
-        raise Bolt11BadBech32StringException()
+        recorder.record("decode", watch.laps, error=exc)
+        raise
+    recorder.record("decode", watch.laps, tag_types(data))
+    return invoice
 
-    if not hrp.startswith("ln"):
-        raise Bolt11StartWithLnException()
 
-    bitarray = u5_to_bitarray(decoded_data)
+def decode_split(hrp: str, data: Sequence[int], signature: bytes) -> Bolt11Invoice:
+    """decode the parts split_invoice() returns"""
+    invoice = parse_split(hrp, data, signature)
+    invoice.payee = check_signature(hrp, data, signature, invoice.payee_raw)
+    return invoice
 
-    # final signature 65 bytes, split it off.
-    if len(bitarray) < 65 * 8:
-        raise Bolt11NoSignatureException()
 
+def parse_split(hrp: str, data: Sequence[int], signature: bytes) -> Bolt11Invoice:
+    """the invoice of the parts split_invoice() returns, signature unchecked"""
     invoice = Bolt11Invoice()
-
-    # extract the signature
-    signature = bitarray[-65 * 8 :].tobytes()
-    invoice.signature = bytes.hex(signature[0:64])
-
-    # the tagged fields as a bitstream
-    data = ConstBitStream(bitarray[: -65 * 8])
+    invoice.signature = signature[0:64]
 
     currency, amount = parse_amount(hrp)
     if currency:
@@ -54,88 +67,190 @@ def decode(a: str) -> Bolt11Invoice:
     if amount:
         invoice.amount = amount
 
-    date = data.read("uint35")
-    assert isinstance(date, int)
-    invoice.date = date
+    invoice.date = u5_to_int(data[:7])
+
+    parse_tags(invoice, data)
 
-    while data.pos != data.len:
-        tag, tagdata, data_length = parse_tagdata(data)
+    return invoice
+
+
+def decode_many(
+    invoices: Iterable[str], workers: Optional[int] = None, chunksize: int = 64
+) -> List[Union[Bolt11Invoice, Exception]]:
+    """
+    decode many invoices across `workers` processes (default: one per cpu).
+    results are in input order, a failing invoice returns its exception
+    instead of an invoice.
+    """
+    return list(decode_iter(invoices, workers, chunksize))
+
+
+def decode_iter(
+    invoices: Iterable[str], workers: Optional[int] = None, chunksize: int = 64
+) -> Iterator[Union[Bolt11Invoice, Exception]]:
+    """
+    like decode_many, but yields the results in input order as they are ready.
+    reads ahead at most two batches of `chunksize` invoices per worker.
+    """
+    if workers == 1:
+        yield from map(_decode_or_exception, invoices)
+        return
+
+    invoices = iter(invoices)
+    batchsize = chunksize * 4 * (workers or os.cpu_count() or 1)
+    with _decode_pool(workers) as pool:
+        yield from _map_ahead(
+            pool,
+            _decode_or_exception,
+            iter(lambda: list(islice(invoices, batchsize)), []),
+            chunksize,
+        )
+
+
+def _decode_pool(workers: Optional[int]):
+    """process pool whose workers use the same signature backend, if it can be
+    selected by name"""
+    from multiprocessing import Pool
 
-        if tag == "d":
-            invoice.description = trim_to_bytes(tagdata).decode("utf-8")
+    backend = get_backend().name
+    initargs = (backend,) if backend in backends else ()
+    return Pool(workers, set_backend if initargs else None, initargs)
 
-        elif tag == "h":
-            if data_length != 52:
-                if not invoice.unknown_tags:
-                    invoice.unknown_tags = []
-                invoice.unknown_tags.append((tag, tagdata))
-            invoice.description_hash = trim_to_bytes(tagdata).hex()
 
-        elif tag == "r":
-            if not invoice.route_hints:
-                invoice.route_hints = []
-            invoice.route_hints.extend(parse_r_tag(tagdata))
+def _map_ahead(pool, func: Callable, batches: Iterator[list], chunksize: int = 1):
+    """pool.map() over batches, mapping the next batch while yielding one"""
+    batch: list = next(batches, [])
+    results = pool.map_async(func, batch, chunksize)
+    while batch:
+        batch = next(batches, [])
+        next_results = pool.map_async(func, batch, chunksize)
+        yield from results.get()
+        results = next_results
 
-        elif tag == "f":
-            if not invoice.fallbacks:
-                invoice.fallbacks = []
-            invoice.fallbacks.append(parse_fallback(tagdata, invoice.currency))
 
-        elif tag == "x":
-            invoice.expiry = tagdata.uint
+def _decode_or_exception(a: InvoiceInput) -> Union[Bolt11Invoice, Exception]:
+    try:
+        return decode(a)
+    except Exception as exc:  # pylint: disable=broad-except
+        return exc
+
+
+def split_invoice(a: InvoiceInput) -> tuple[str, Sequence[int], bytes]:
+    """bech32 decode an invoice into the hrp, the timestamp and tagged fields
+    as 5-bit groups, and the signature"""
 
-        # featured bits
-        # https://github.com/lightning/bolts/blob/master/11-payment-encoding.md#feature-bits
-        elif tag == "9":
-            invoice.features = trim_to_bytes(tagdata).hex()
+    return split_data(*bech32_decode(a))
 
-        elif tag == "p":
-            if data_length != 52:
-                if not invoice.unknown_tags:
-                    invoice.unknown_tags = []
-                invoice.unknown_tags.append((tag, tagdata.tobytes().hex()))
-            invoice.payment_hash = trim_to_bytes(tagdata).hex()
 
-        elif tag == "s":
-            invoice.payment_secret = trim_to_bytes(tagdata).hex()
+def split_data(hrp: str, decoded_data: bytes) -> tuple[str, Sequence[int], bytes]:
+    """split bech32 decoded 5-bit groups into the timestamp and tagged fields,
+    and the signature"""
+    if not hrp.startswith("ln"):
+        raise Bolt11StartWithLnException()
 
-        elif tag == "n":
-            invoice.payee = trim_to_bytes(tagdata).hex()
+    # final signature 65 bytes (104 x 5 bits), split it off.
+    if len(decoded_data) < 104 + 7:
+        raise Bolt11NoSignatureException()
 
-        else:
+    # one byte per 5-bit group in a single buffer, the tagged fields are
+    # memoryview slices of it and only copied when packed into bytes
+    data = memoryview(decoded_data)
+    return hrp, data[:-104], u5_to_bytes(data[-104:])
+
+
+def parse_tags(invoice: Bolt11Invoice, data: Sequence[int]) -> None:
+    """set the invoice fields from the tagged fields following the timestamp"""
+    for _, tag, tagdata in iter_tags(data):
+        parse_tag(invoice, tag, tagdata)
+
+
+def iter_tags(data: Sequence[int]) -> Iterator[tuple[int, str, Sequence[int]]]:
+    """position, type and data of every tagged field following the timestamp"""
+    pos = 7
+    while pos != len(data):
+        tag, tagdata, data_length = parse_tagdata(data, pos)
+        yield pos, tag, tagdata
+        pos += 3 + data_length
+
+
+def parse_tag(invoice: Bolt11Invoice, tag: str, tagdata: Sequence[int]) -> None:
+    """set the invoice fields of one tagged field"""
+    data_length = len(tagdata)
+    if tag == "d":
+        invoice.description = u5_to_bytes(tagdata, pad=False).decode("utf-8")
+
+    elif tag == "h":
+        if data_length != 52:
             if not invoice.unknown_tags:
                 invoice.unknown_tags = []
-            invoice.unknown_tags.append((tag, trim_to_bytes(tagdata).hex()))
+            invoice.unknown_tags.append((tag, u5_to_bytes(tagdata).hex()))
+        invoice.description_hash = u5_to_bytes(tagdata, pad=False)
+
+    elif tag == "r":
+        if not invoice.route_hints:
+            invoice.route_hints = RouteHintTable()
+        invoice.route_hints.extend_bytes(u5_to_bytes(tagdata, pad=False))
+
+    elif tag == "f":
+        if not invoice.fallbacks:
+            invoice.fallbacks = []
+        invoice.fallbacks.append(parse_fallback(tagdata, invoice.currency))
 
-    message = bytearray([ord(c) for c in hrp]) + data.tobytes()
+    elif tag == "x":
+        invoice.expiry = u5_to_int(tagdata)
+
+    # featured bits
+    # https://github.com/lightning/bolts/blob/master/11-payment-encoding.md#feature-bits
+    elif tag == "9":
+        invoice.features = u5_to_bytes(tagdata, pad=False).hex()
+
+    elif tag == "p":
+        if data_length != 52:
+            if not invoice.unknown_tags:
+                invoice.unknown_tags = []
+            invoice.unknown_tags.append((tag, u5_to_bytes(tagdata).hex()))
+        invoice.payment_hash = u5_to_bytes(tagdata, pad=False)
+
+    elif tag == "s":
+        invoice.payment_secret = u5_to_bytes(tagdata, pad=False)
+
+    elif tag == "n":
+        invoice.payee = u5_to_bytes(tagdata, pad=False)
 
-    if hasattr(invoice, "payee") and invoice.payee:
-        key = VerifyingKey.from_string(bytes.fromhex(invoice.payee), curve=SECP256k1)
-        key.verify(signature[0:64], message, sha256, sigdecode=sigdecode_string)
     else:
-        keys = VerifyingKey.from_public_key_recovery(
-            signature[0:64], message, SECP256k1, sha256
-        )
-        signaling_byte = signature[64]
-        key = keys[int(signaling_byte)]
-        invoice.payee = key.to_string("compressed").hex()
+        if not invoice.unknown_tags:
+            invoice.unknown_tags = []
+        invoice.unknown_tags.append((tag, u5_to_bytes(tagdata, pad=False).hex()))
 
-    return invoice
 
+def tag_types(data: Sequence[int]) -> List[str]:
+    """type of every tagged field following the timestamp"""
+    types = []
+    pos = 7
+    while pos < len(data):
+        types.append(CHARSET[data[pos]])
+        pos += 3 + data[pos + 1] * 32 + data[pos + 2]
+    return types
 
-def parse_r_tag(tagdata) -> List[Route]:
-    route_hints = []
-    s = ConstBitStream(tagdata)
-    while s.pos + 264 + 64 + 32 + 32 + 16 < s.len:
-        route = Route(
-            pubkey=s.read(264).tobytes().hex(),
-            short_channel_id=readable_scid(s.read(64).intbe),
-            base_fee_msat=s.read(32).intbe,
-            ppm_fee=s.read(32).intbe,
-            cltv=s.read(16).intbe,
-        )
-        route_hints.append(route)
-    return route_hints
+
+def check_signature(
+    hrp: str, data: Sequence[int], signature: bytes, payee: Optional[bytes] = None
+) -> bytes:
+    """verify the signature against `payee`, or recover the payee from it"""
+    message = hrp.encode() + u5_to_bytes(data)
+
+    backend = get_backend()
+    if payee:
+        if not backend.verify(payee, signature[0:64], message):
+            raise Bolt11SignatureVerifyException()
+        return payee
+
+    signaling_byte = signature[64]
+    return backend.recover(signature[0:64], int(signaling_byte), message)
+
+
+def parse_r_tag(tagdata: bytes) -> List[Route]:
+    return list(RouteHintTable.from_bytes(tagdata))
 
 
 def parse_amount(hrp: str) -> tuple[Optional[str], Optional[int]]:
@@ -159,14 +274,13 @@ def parse_amount(hrp: str) -> tuple[Optional[str], Optional[int]]:
 # data (data_length x 5 bits)
 # Note that the maximum length of a Tagged Field's data is constricted by the maximum value of data_length.
 # This is 1023 x 5 bits, or 639 bytes.
-def parse_tagdata(data: ConstBitStream) -> tuple[str, Bits, int]:
-    _tag, _len1, _len2 = data.readlist(["uint5", "uint5", "uint5"])
-    assert (
-        isinstance(_tag, int) and isinstance(_len1, int) and isinstance(_len2, int)
-    ), "_tag, _len1, _len2 should be int"
-    length = _len1 * 32 + _len2
+def parse_tagdata(data: Sequence[int], pos: int) -> tuple[str, Sequence[int], int]:
+    if pos + 3 > len(data):
+        raise Bolt11MalformedTagException()
+    length = data[pos + 1] * 32 + data[pos + 2]
     # TODO test failes with 820 bytes
     # assert length * 5 <= 639, f"maximum value of 639 bytes data_length exceeded by {length * 5}"
-    tagdata = data.read(length * 5)
-    assert isinstance(tagdata, Bits), "tagdata should be Bits"
-    return CHARSET[_tag], tagdata, length
+    tagdata = data[pos + 3 : pos + 3 + length]
+    if len(tagdata) != length:
+        raise Bolt11MalformedTagException()
+    return CHARSET[data[pos]], tagdata, length
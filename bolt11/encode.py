@@ -1,14 +1,21 @@
 """ Bolt11 Invoice Encoder """
 
 from decimal import Decimal
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple, Union
 
-from bech32 import bech32_encode
-from bitstring import BitArray, pack
-from secp256k1 import PrivateKey
-
+from . import metrics
+from .codec import bech32_encode
 from .fallback import encode_fallback
-from .helpers import bitarray_to_u5, shorten_amount, tagged, tagged_bytes
-from .models import Bolt11Invoice
+from .helpers import (
+    bytes_to_u5,
+    int_to_u5,
+    shorten_amount,
+    tagged,
+    tagged_bytes,
+    u5_to_bytes,
+)
+from .models import ROUTE_HINT, Bolt11Invoice
 
 # TODO: not done at all :D
 # def encode(addr: Bolt11Invoice, privkey: str) -> str:
@@ -90,23 +97,98 @@ from .models import Bolt11Invoice
 
 
 def lnencode(addr: Bolt11Invoice, privkey_hex: str) -> str:
-    if addr.amount:
-        amount = Decimal(str(addr.amount))
+    return InvoiceSigner(privkey_hex).encode(addr)
+
+
+class InvoiceSigner:
+    """
+    Encode and sign invoices with one private key. The key and its
+    libsecp256k1 context are set up once and reused for every invoice.
+    """
+
+    def __init__(self, privkey_hex: str):
+        from secp256k1 import PrivateKey
+
+        self.privkey = PrivateKey(bytes.fromhex(privkey_hex))
+
+    def encode(self, addr: Bolt11Invoice) -> str:
+        recorder = metrics.current
+        if recorder is not None:
+            return self._encode_measured(addr, recorder)
+        hrp, hrp_bytes = invoice_hrp(addr.currency, addr.amount)
+        data = encode_data(addr)
+        data += self.sign(hrp_bytes, data)
+        return bech32_encode(hrp, data)
+
+    def sign(self, hrp_bytes: bytes, data: List[int]) -> List[int]:
+        """the recoverable signature of an invoice as 5-bit groups"""
+        # We actually sign the hrp, then data (padded to 8 bits with zeroes).
+        sig = self.privkey.ecdsa_sign_recoverable(hrp_bytes + u5_to_bytes(data))
+        # This doesn't actually serialize, but returns a pair of values :(
+        sig, recid = self.privkey.ecdsa_recoverable_serialize(sig)
+        return bytes_to_u5(bytes(sig) + bytes([recid]))
+
+    def _encode_measured(self, addr: Bolt11Invoice, recorder: metrics.Metrics) -> str:
+        watch = metrics.Stopwatch()
+        try:
+            hrp, hrp_bytes = invoice_hrp(addr.currency, addr.amount)
+            data = encode_data(addr)
+            watch.lap("tags")
+            data += self.sign(hrp_bytes, data)
+            watch.lap("signature")
+            encoded = bech32_encode(hrp, data)
+            watch.lap("bech32")
+        except Exception as exc:
+            recorder.record("encode", watch.laps, error=exc)
+            raise
+        recorder.record("encode", watch.laps, ["p", *(k for k, _ in addr.tags or ())])
+        return encoded
+
+    def encode_many(
+        self, invoices: Iterable[Bolt11Invoice], workers: int = 1
+    ) -> List[Union[str, Exception]]:
+        """
+        encode many invoices, on `workers` threads if more than one. results
+        are in input order, a failing invoice returns its exception instead.
+        """
+        if workers == 1:
+            return list(map(self._encode_or_exception, invoices))
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(workers) as executor:
+            return list(executor.map(self._encode_or_exception, invoices))
+
+    def _encode_or_exception(self, addr: Bolt11Invoice) -> Union[str, Exception]:
+        try:
+            return self.encode(addr)
+        except Exception as exc:  # pylint: disable=broad-except
+            return exc
+
+
+@lru_cache(maxsize=1024)
+def invoice_hrp(currency: str, amount: Optional[int]) -> Tuple[str, bytes]:
+    """the human readable part of an invoice, as string and signed bytes"""
+    if amount:
+        amount_dec = Decimal(str(amount))
         # We can only send down to millisatoshi.
-        if amount * 10**12 % 10:
-            raise ValueError(f"Cannot encode {addr.amount}: too many decimal places")
+        if amount_dec * 10**12 % 10:
+            raise ValueError(f"Cannot encode {amount}: too many decimal places")
 
-        hrp_amount = addr.currency + shorten_amount(amount)
+        hrp_amount = currency + shorten_amount(amount_dec)
     else:
-        hrp_amount = addr.currency
+        hrp_amount = currency
 
     hrp = "ln" + hrp_amount + "0n"
+    return hrp, hrp.encode()
+
 
-    # Start with the timestamp
-    data = pack("uint:35", addr.date)
+def encode_data(addr: Bolt11Invoice) -> List[int]:
+    """the timestamp and tagged fields of an invoice as 5-bit groups"""
+    # 5-bit groups, starting with the timestamp
+    data = int_to_u5(addr.date, 7)
 
     # Payment hash
-    data += tagged_bytes("p", addr.payment_hash)
+    data += tagged_bytes("p", addr.payment_hash_raw)  # type: ignore
     tags_set = set()
 
     for k, v in addr.tags:  # type: ignore
@@ -118,27 +200,19 @@ def lnencode(addr: Bolt11Invoice, privkey_hex: str) -> str:
                 raise ValueError(f"Duplicate '{k}' tag")
 
         if k == "r":
-            route = BitArray()
-            for step in v:
-                pubkey, channel, feebase, feerate, cltv = step
-                route.append(
-                    BitArray(pubkey)
-                    + BitArray(channel)
-                    + pack("intbe:32", feebase)
-                    + pack("intbe:32", feerate)
-                    + pack("intbe:16", cltv)
-                )
-            data += tagged("r", route)
+            route = b"".join(
+                ROUTE_HINT.pack(pubkey, _scid(channel), feebase, feerate, cltv)
+                for pubkey, channel, feebase, feerate, cltv in v
+            )
+            data += tagged_bytes("r", route)
         elif k == "f":
             data += encode_fallback(v, addr.currency)
         elif k == "d":
             data += tagged_bytes("d", v.encode())
         elif k == "x":
-            # Get minimal length by trimming leading 5 bits at a time.
-            expirybits = pack("intbe:64", v)[4:64]
-            while expirybits.startswith("0b00000"):
-                expirybits = expirybits[5:]
-            data += tagged("x", expirybits)
+            # Minimal length of the 60 bit expiry, in 5-bit groups.
+            expiry = v & (1 << 60) - 1
+            data += tagged("x", int_to_u5(expiry, (expiry.bit_length() + 4) // 5))
         elif k == "h":
             data += tagged_bytes("h", v)
         elif k == "n":
@@ -154,13 +228,9 @@ def lnencode(addr: Bolt11Invoice, privkey_hex: str) -> str:
     if "d" not in tags_set and "h" not in tags_set:
         raise ValueError("Must include either 'd' or 'h'")
 
-    # We actually sign the hrp, then data (padded to 8 bits with zeroes).
-    privkey = PrivateKey(bytes.fromhex(privkey_hex))
-    sig = privkey.ecdsa_sign_recoverable(
-        bytearray([ord(c) for c in hrp]) + data.tobytes()
-    )
-    # This doesn't actually serialize, but returns a pair of values :(
-    sig, recid = privkey.ecdsa_recoverable_serialize(sig)
-    data += bytes(sig) + bytes([recid])
+    return data
+
 
-    return bech32_encode(hrp, bitarray_to_u5(data))
+def _scid(channel: Union[int, bytes]) -> int:
+    """short channel id of a route hint, 8 bytes or an int as in a decoded Route"""
+    return channel if isinstance(channel, int) else int.from_bytes(channel, "big")
@@ -5,6 +5,10 @@ class Bolt11SignatureRecoveryException(Exception):
     """Signature recovery failed"""
 
 
+class Bolt11SignatureVerifyException(Exception):
+    """Signature verification failed"""
+
+
 class Bolt11BadBech32StringException(Exception):
     """Bad Bech32 string Exception"""
 
@@ -13,9 +17,17 @@ class Bolt11NoSignatureException(Exception):
     """Too short to contain signature"""
 
 
+class Bolt11MalformedTagException(Exception):
+    """Tagged field exceeds the data"""
+
+
 class Bolt11StartWithLnException(Exception):
     """Does not start with ln"""
 
 
 class Bolt11InvalidAmountException(Exception):
     """Invalid amount Exception"""
+
+
+class Bolt11RequestTooLargeException(Exception):
+    """Server request exceeds the size limit"""
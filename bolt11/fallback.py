@@ -1,10 +1,10 @@
 """ Bolt11 fallbacks for decoder and encoder"""
 
-import base58
-from bech32 import bech32_decode, bech32_encode
-from bitstring import pack
+from typing import List, Sequence
 
-from .helpers import bitarray_to_u5, tagged, u5_to_bitarray
+from .codec import bech32_decode, bech32_encode
+from .exceptions import Bolt11BadBech32StringException
+from .helpers import bytes_to_u5, tagged, u5_to_bytes
 
 # Map of classical and witness address prefixes
 base58_prefix_map = {"bc": (0, 5), "tb": (111, 196)}
@@ -18,25 +18,31 @@ def is_p2sh(currency, prefix):
     return prefix == base58_prefix_map[currency][1]
 
 
-def parse_fallback(fallback, currency) -> str:
-    """parse fallback addresses."""
+def parse_fallback(fallback: Sequence[int], currency) -> str:
+    """parse fallback addresses from 5-bit groups."""
     if currency in ("bc", "tb"):
-        wver = fallback[0:5].uint
+        import base58
+
+        wver = fallback[0]
         if wver == 17:
             return base58.b58encode_check(bytes([base58_prefix_map[currency][0]])).hex()
         if wver == 18:
             return base58.b58encode_check(
-                bytes([base58_prefix_map[currency][1]]) + fallback[5:].tobytes()
+                bytes([base58_prefix_map[currency][1]]) + u5_to_bytes(fallback[1:])
             ).hex()
         if wver <= 16:
-            return bech32_encode(currency, bitarray_to_u5(fallback))
-    return fallback.tobytes().hex()
+            return bech32_encode(currency, fallback)
+    return u5_to_bytes(fallback).hex()
 
 
-def encode_fallback(fallback, currency):
+def encode_fallback(fallback: str, currency) -> List[int]:
     """Encode all supported fallback addresses."""
     if currency in ("bc", "tb"):
-        fbhrp, witness = bech32_decode(fallback)
+        wprog: Sequence[int]
+        try:
+            fbhrp, witness = bech32_decode(fallback)
+        except Bolt11BadBech32StringException:
+            fbhrp, witness = "", b""
         if fbhrp:
             if fbhrp != currency:
                 raise ValueError("Not a bech32 address for this currency")
@@ -44,8 +50,10 @@ def encode_fallback(fallback, currency):
             wver = witness[0]
             if wver > 16:
                 raise ValueError(f"Invalid witness version {witness[0]}")
-            wprog = u5_to_bitarray(witness[1:])
+            wprog = witness[1:]
         else:
+            import base58
+
             addr = base58.b58decode_check(fallback)
             if is_p2pkh(currency, addr[0]):
                 wver = 17
@@ -53,7 +61,7 @@ def encode_fallback(fallback, currency):
                 wver = 18
             else:
                 raise ValueError(f"Unknown address type for {currency}")
-            wprog = addr[1:]
-        return tagged("f", pack("uint:5", wver) + wprog)
+            wprog = bytes_to_u5(addr[1:])
+        return tagged("f", [wver, *wprog])
 
     raise NotImplementedError(f"Support for currency {currency} not implemented")
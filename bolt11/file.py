@@ -0,0 +1,74 @@
+""" Bolt11 decoding of invoice files """
+import mmap
+import os
+from itertools import islice
+from typing import Iterator, List, Optional, Tuple, Union
+
+from .decode import _decode_or_exception, _decode_pool, _map_ahead
+from .models import Bolt11Invoice
+
+Record = Tuple[int, Union[Bolt11Invoice, Exception]]
+PathLike = Union[str, "os.PathLike[str]"]
+
+
+def decode_file(
+    path: PathLike, workers: Optional[int] = 1, rangesize: int = 1 << 20
+) -> Iterator[Record]:
+    """
+    decode a file of newline-delimited invoices through a memory map, yielding
+    (byte offset, invoice or exception) for every non-empty line in file order.
+    with `workers` other than 1 (None: one per cpu), worker processes decode
+    ranges of about `rangesize` bytes, at most two ranges per worker ahead.
+    """
+    if os.path.getsize(path) == 0:
+        return
+    if workers == 1:
+        with _map_file(path) as buffer:
+            yield from _decode_range(buffer, 0, len(buffer))
+        return
+
+    with _map_file(path) as buffer, _decode_pool(workers) as pool:
+        ranges = _ranges(buffer, rangesize)
+        batchsize = 2 * (workers or os.cpu_count() or 1)
+        batches = iter(
+            lambda: [(path, start, end) for start, end in islice(ranges, batchsize)], []
+        )
+        for records in _map_ahead(pool, _decode_file_range, batches):
+            yield from records
+
+
+def _map_file(path: PathLike) -> mmap.mmap:
+    with open(path, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if hasattr(buffer, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+        buffer.madvise(mmap.MADV_SEQUENTIAL)
+    return buffer
+
+
+def _ranges(buffer: mmap.mmap, rangesize: int) -> Iterator[Tuple[int, int]]:
+    """byte ranges of about `rangesize`, each ending after a newline"""
+    start = 0
+    while start < len(buffer):
+        end = buffer.find(b"\n", start + max(rangesize, 1) - 1) + 1 or len(buffer)
+        yield start, end
+        start = end
+
+
+def _decode_range(buffer: mmap.mmap, start: int, end: int) -> Iterator[Record]:
+    pos = start
+    while pos < end:
+        newline = buffer.find(b"\n", pos, end)
+        if newline < 0:
+            newline = end
+        line = buffer[pos:newline]
+        invoice = line.strip()
+        if invoice:
+            offset = pos + len(line) - len(line.lstrip())
+            yield offset, _decode_or_exception(invoice)
+        pos = newline + 1
+
+
+def _decode_file_range(args: Tuple[PathLike, int, int]) -> List[Record]:
+    path, start, end = args
+    with _map_file(path) as buffer:
+        return list(_decode_range(buffer, start, end))
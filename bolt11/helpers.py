@@ -1,11 +1,9 @@
 """ Bolt11 helpers """
 import re
 from decimal import Decimal
-from typing import List
-
-from bech32 import CHARSET
-from bitstring import BitArray, ConstBitStream, pack
+from typing import List, Sequence
 
+from .codec import CHARSET
 from .exceptions import Bolt11InvalidAmountException
 
 
@@ -41,32 +39,15 @@ def unshorten_amount(amount: str) -> int:
     return int(amount) * 100_000_000_000
 
 
-# Tagged field containing BitArray
-def tagged(char, data):
-    # Tagged fields need to be zero-padded to 5 bits.
-    while data.len % 5 != 0:
-        data.append("0b0")
-    return (
-        pack(
-            "uint:5, uint:5, uint:5",
-            CHARSET.find(char),
-            (data.len / 5) / 32,
-            (data.len / 5) % 32,
-        )
-        + data
-    )
-
+# Tagged field containing 5-bit groups
+def tagged(char: str, data: Sequence[int]) -> List[int]:
+    if len(data) > 1023:
+        raise ValueError(f"Tagged field '{char}' exceeds 1023 x 5 bits")
+    return [CHARSET.find(char), len(data) >> 5, len(data) & 31, *data]
 
-def tagged_bytes(char, data):
-    return tagged(char, BitArray(data))
 
-
-def trim_to_bytes(barr):
-    # removes a byte if necessary.
-    b = barr.tobytes()
-    if barr.len % 8 != 0:
-        return b[:-1]
-    return b
+def tagged_bytes(char: str, data: bytes) -> List[int]:
+    return tagged(char, bytes_to_u5(data))
 
 
 def readable_scid(short_channel_id: int) -> str:
@@ -76,17 +57,51 @@ def readable_scid(short_channel_id: int) -> str:
     return f"{blockheight}x{transactionindex}x{outputindex}"
 
 
-def u5_to_bitarray(arr: List[int]) -> BitArray:
-    ret = BitArray()
-    for a in arr:
-        ret += pack("uint5", a)
-    return ret
-
-
-def bitarray_to_u5(barr):
-    assert barr.len % 5 == 0
-    ret = []
-    s = ConstBitStream(barr)
-    while s.pos != s.len:
-        ret.append(s.read("uint5"))
+def u5_to_int(data: Sequence[int]) -> int:
+    """Big-endian integer of 5-bit groups"""
+    value = 0
+    for u5 in data:
+        value = value << 5 | u5
+    return value
+
+
+def u5_to_bytes(data: Sequence[int], pad: bool = True) -> bytes:
+    """Pack 5-bit groups into bytes, either zero padding or dropping the last
+    partial byte."""
+    ret = bytearray()
+    # 8 groups of 5 bits make 5 whole bytes
+    end = len(data) - len(data) % 8
+    for i in range(0, end, 8):
+        a, b, c, d, e, f, g, h = data[i : i + 8]
+        ret += (
+            a << 35 | b << 30 | c << 25 | d << 20 | e << 15 | f << 10 | g << 5 | h
+        ).to_bytes(5, "big")
+    if end != len(data):
+        bits = (len(data) - end) * 5
+        value = u5_to_int(data[end:])
+        if pad:
+            ret += (value << (-bits % 8)).to_bytes((bits + 7) // 8, "big")
+        else:
+            ret += (value >> (bits % 8)).to_bytes(bits // 8, "big")
+    return bytes(ret)
+
+
+def int_to_u5(value: int, length: int) -> List[int]:
+    """`length` 5-bit groups of an integer, big-endian"""
+    return [(value >> shift) & 31 for shift in range(5 * length - 5, -5, -5)]
+
+
+def bytes_to_u5(data: bytes) -> List[int]:
+    """Split bytes into 5-bit groups, zero padding the last group"""
+    ret: List[int] = []
+    # 5 bytes make 8 groups of 5 bits
+    end = len(data) - len(data) % 5
+    for i in range(end // 5):
+        ret += int_to_u5(int.from_bytes(data[i * 5 : i * 5 + 5], "big"), 8)
+    if end != len(data):
+        bits = (len(data) - end) * 8
+        length = (bits + 4) // 5
+        ret += int_to_u5(
+            int.from_bytes(data[end:], "big") << (length * 5 - bits), length
+        )
     return ret
@@ -0,0 +1,147 @@
+""" Bolt11 lazy decoding """
+# pylint: disable=unnecessary-dunder-call
+from typing import Sequence
+
+from .decode import (
+    InvoiceInput,
+    check_signature,
+    parse_amount,
+    parse_tagdata,
+    parse_tags,
+    split_invoice,
+)
+from .helpers import u5_to_int
+from .models import Bolt11Invoice
+
+# slots of Bolt11Invoice filled from the tagged fields
+_TAG_SLOTS = tuple(
+    name
+    for name in Bolt11Invoice.__slots__
+    if name not in ("_signature", "amount", "date", "currency", "tags")
+)
+
+
+def _tag_field(name: str) -> property:
+    """invoice field that parses the tagged fields on first access"""
+    base = getattr(Bolt11Invoice, name)
+
+    def fget(self):
+        self.parse()
+        return base.__get__(self, Bolt11Invoice)
+
+    def fset(self, value):
+        self.parse()
+        base.__set__(self, value)
+
+    return property(fget, fset)
+
+
+def _payee_field(name: str) -> property:
+    """invoice payee that checks the signature on first access"""
+    base = getattr(Bolt11Invoice, name)
+
+    def fget(self):
+        self.verify()
+        return base.__get__(self, Bolt11Invoice)
+
+    def fset(self, value):
+        self.parse()
+        base.__set__(self, value)
+
+    return property(fget, fset)
+
+
+class LazyBolt11Invoice(Bolt11Invoice):
+    """
+    Bolt11Invoice decoded up to the tag framing. The tagged fields are parsed on
+    first access, the signature is only checked when `payee` is read or `verify()`
+    is called. Always call `verify()` before acting on an invoice.
+    """
+
+    __slots__ = ("_hrp", "_data", "_recoverable_signature", "_parsed", "_verified")
+
+    payment_hash = _tag_field("payment_hash")
+    payment_hash_raw = _tag_field("payment_hash_raw")
+    payment_secret = _tag_field("payment_secret")
+    payment_secret_raw = _tag_field("payment_secret_raw")
+    description = _tag_field("description")  # type: ignore[assignment]
+    description_hash = _tag_field("description_hash")
+    description_hash_raw = _tag_field("description_hash_raw")
+    route_hints = _tag_field("route_hints")  # type: ignore[assignment]
+    fallbacks = _tag_field("fallbacks")  # type: ignore[assignment]
+    unknown_tags = _tag_field("unknown_tags")  # type: ignore[assignment]
+    features = _tag_field("features")  # type: ignore[assignment]
+    expiry = _tag_field("expiry")  # type: ignore[assignment]
+    payee = _payee_field("payee")
+    payee_raw = _payee_field("payee_raw")
+
+    def __init__(self, hrp: str, data: Sequence[int], signature: bytes):
+        # the defaults must not trigger parsing
+        self._parsed = True
+        self._verified = True
+        super().__init__()
+        self._hrp = hrp
+        # a copy, a memoryview cannot be pickled
+        self._data = bytes(data)
+        self._recoverable_signature = signature
+
+        self.signature = signature[0:64]
+
+        currency, amount = parse_amount(hrp)
+        if currency:
+            self.currency = currency
+        if amount:
+            self.amount = amount
+
+        self.date = u5_to_int(data[:7])
+
+        # walk the tag framing, so truncated invoices fail right away
+        pos = 7
+        while pos != len(data):
+            _, _, data_length = parse_tagdata(data, pos)
+            pos += 3 + data_length
+
+        self._parsed = False
+        self._verified = False
+
+    def parse(self) -> None:
+        """parse the tagged fields, fields set before keep their value"""
+        if self._parsed:
+            return
+        invoice = Bolt11Invoice()
+        # fallback addresses depend on the currency
+        invoice.currency = self.currency
+        parse_tags(invoice, self._data)
+        for name in _TAG_SLOTS:
+            slot = Bolt11Invoice.__dict__[name]
+            slot.__set__(self, slot.__get__(invoice, Bolt11Invoice))
+        self._parsed = True
+
+    def verify(self) -> None:
+        """check the signature, recovering the payee if there is no `n` tag"""
+        if self._verified:
+            return
+        self.parse()
+        self._payee = check_signature(
+            self._hrp, self._data, self._recoverable_signature, self._payee
+        )
+        self._verified = True
+
+    def __getstate__(self):
+        # the slots as stored, the lazy fields would parse and verify on access
+        return tuple(slot.__get__(self, LazyBolt11Invoice) for slot in _STATE_SLOTS)
+
+    def __setstate__(self, state):
+        for slot, value in zip(_STATE_SLOTS, state):
+            slot.__set__(self, value)
+
+
+# slot descriptors of the invoice and the lazy decoding state
+_STATE_SLOTS = tuple(
+    Bolt11Invoice.__dict__[name] for name in Bolt11Invoice.__slots__
+) + tuple(LazyBolt11Invoice.__dict__[name] for name in LazyBolt11Invoice.__slots__)
+
+
+def decode_lazy(a: InvoiceInput) -> LazyBolt11Invoice:
+    """Bolt11 decode function, deferring tag parsing and the signature check"""
+    return LazyBolt11Invoice(*split_invoice(a))
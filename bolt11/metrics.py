@@ -0,0 +1,108 @@
+""" Bolt11 decode and encode metrics """
+from collections import defaultdict
+from threading import Lock
+from time import perf_counter
+from typing import Any, Callable, DefaultDict, Dict, Iterable, Optional
+
+from .signature import get_backend
+
+# operation, stage durations in seconds, tag types and the exception raised
+Callback = Callable[[str, Dict[str, float], Iterable[str], Optional[Exception]], None]
+
+
+class Stopwatch:
+    """durations of consecutive stages of one call"""
+
+    __slots__ = ("laps", "_last")
+
+    def __init__(self) -> None:
+        self.laps: Dict[str, float] = {}
+        self._last = perf_counter()
+
+    def lap(self, stage: str) -> None:
+        now = perf_counter()
+        self.laps[stage] = now - self._last
+        self._last = now
+
+
+class Metrics:
+    """
+    Time spent per stage, calls and errors of decode() and lnencode(), counts
+    per tag type and counters like decode cache hits. Collects nothing until
+    it is enabled with set_metrics(). `callback` is called after every
+    recorded call, with the operation, stage durations, tag types and the
+    exception if it failed. Calls in decode_many() worker processes are not
+    recorded.
+    """
+
+    def __init__(self, callback: Optional[Callback] = None):
+        self.callback = callback
+        self.calls: DefaultDict[str, int] = defaultdict(int)
+        self.seconds: DefaultDict[str, DefaultDict[str, float]] = defaultdict(
+            lambda: defaultdict(float)
+        )
+        self.errors: DefaultDict[str, DefaultDict[str, int]] = defaultdict(
+            lambda: defaultdict(int)
+        )
+        self.tags: DefaultDict[str, int] = defaultdict(int)
+        self.counters: DefaultDict[str, int] = defaultdict(int)
+        self._lock = Lock()
+
+    def record(
+        self,
+        operation: str,
+        laps: Dict[str, float],
+        tags: Iterable[str] = (),
+        error: Optional[Exception] = None,
+    ) -> None:
+        tags = list(tags)
+        with self._lock:
+            self.calls[operation] += 1
+            seconds = self.seconds[operation]
+            for stage, duration in laps.items():
+                seconds[stage] += duration
+            if error is not None:
+                self.errors[operation][type(error).__name__] += 1
+            for tag in tags:
+                self.tags[tag] += 1
+        if self.callback is not None:
+            self.callback(operation, laps, tags, error)
+
+    def count(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            self.counters[name] += value
+
+    def clear(self) -> None:
+        with self._lock:
+            self.calls.clear()
+            self.seconds.clear()
+            self.errors.clear()
+            self.tags.clear()
+            self.counters.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """totals so far, with the pubkey cache of the signature backend"""
+        with self._lock:
+            return {
+                "calls": dict(self.calls),
+                "seconds": {op: dict(laps) for op, laps in self.seconds.items()},
+                "errors": {op: dict(errors) for op, errors in self.errors.items()},
+                "tags": dict(self.tags),
+                "counters": dict(self.counters),
+                "pubkey_cache": get_backend().pubkey_cache.stats(),
+            }
+
+
+# checked by every decode and encode, None keeps them uninstrumented
+current: Optional[Metrics] = None
+
+
+def get_metrics() -> Optional[Metrics]:
+    return current
+
+
+def set_metrics(metrics: Optional[Metrics]) -> Optional[Metrics]:
+    """enable recording into `metrics`, None disables it again"""
+    global current  # pylint: disable=global-statement
+    current = metrics
+    return current
@@ -1,32 +1,298 @@
 """ Bolt11 models """
-import json
 import time
-from typing import List, NamedTuple, Optional
+from array import array
+from functools import lru_cache
+from operator import attrgetter
+from struct import Struct
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+    overload,
+)
+
+from .helpers import readable_scid
+
+# pubkey (33 bytes), short_channel_id (8), fee_base_msat (4),
+# fee_proportional_millionths (4), cltv_expiry_delta (2)
+ROUTE_HINT = Struct(">33sQIIH")
 
 
 class Route(NamedTuple):
-    pubkey: str
-    short_channel_id: str
+    """route hint hop, pubkey and short channel id formatted on access"""
+
+    pubkey_raw: bytes
+    scid: int
     base_fee_msat: int
     ppm_fee: int
     cltv: int
 
+    @property
+    def pubkey(self) -> str:
+        return self.pubkey_raw.hex()
+
+    @property
+    def short_channel_id(self) -> str:
+        return readable_scid(self.scid)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "pubkey": self.pubkey,
+            "short_channel_id": self.short_channel_id,
+            "base_fee_msat": self.base_fee_msat,
+            "ppm_fee": self.ppm_fee,
+            "cltv": self.cltv,
+        }
+
+
+class RouteHintTable(Sequence[Route]):
+    """
+    Route hint hops in columns: the pubkeys in one buffer, short channel ids,
+    fees and cltv deltas in arrays. Hops only become Route tuples when indexed.
+    """
+
+    __slots__ = ("pubkeys", "short_channel_ids", "base_fees_msat", "ppm_fees", "cltvs")
+
+    def __init__(self, routes: Iterable[Route] = ()) -> None:
+        self.pubkeys = bytearray()
+        self.short_channel_ids = array("Q")
+        self.base_fees_msat = array("L")
+        self.ppm_fees = array("L")
+        self.cltvs = array("H")
+        for route in routes:
+            self.extend_bytes(ROUTE_HINT.pack(*route))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "RouteHintTable":
+        table = cls()
+        table.extend_bytes(data)
+        return table
+
+    def extend_bytes(self, data: bytes) -> None:
+        """add the hops of an `r` tag, ignoring a trailing partial hop"""
+        end = len(data) - len(data) % ROUTE_HINT.size
+        hops = list(ROUTE_HINT.iter_unpack(memoryview(data)[:end]))
+        if not hops:
+            return
+        pubkeys, scids, base_fees, ppm_fees, cltvs = zip(*hops)
+        self.pubkeys += b"".join(pubkeys)
+        self.short_channel_ids.extend(scids)
+        self.base_fees_msat.extend(base_fees)
+        self.ppm_fees.extend(ppm_fees)
+        self.cltvs.extend(cltvs)
+
+    def pubkey(self, index: int) -> bytes:
+        start = range(len(self))[index] * 33
+        return bytes(self.pubkeys[start : start + 33])
+
+    def find_scid(self, scid: int) -> int:
+        """index of the first hop over a channel, -1 if there is none"""
+        try:
+            return self.short_channel_ids.index(scid)
+        except ValueError:
+            return -1
+
+    def hops_from(self, pubkey: bytes) -> List[int]:
+        """indexes of the hops starting at a node"""
+        indexes = []
+        start = self.pubkeys.find(pubkey)
+        while start >= 0:
+            if start % 33 == 0:
+                indexes.append(start // 33)
+            start = self.pubkeys.find(pubkey, start + 1)
+        return indexes
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Route.to_dict() of every hop, formatted column by column"""
+        pubkeys = self.pubkeys.hex()
+        return [
+            {
+                "pubkey": pubkeys[i * 66 : i * 66 + 66],
+                "short_channel_id": readable_scid(scid),
+                "base_fee_msat": base_fee_msat,
+                "ppm_fee": ppm_fee,
+                "cltv": cltv,
+            }
+            for i, scid, base_fee_msat, ppm_fee, cltv in zip(
+                range(len(self)),
+                self.short_channel_ids,
+                self.base_fees_msat,
+                self.ppm_fees,
+                self.cltvs,
+            )
+        ]
+
+    def __len__(self) -> int:
+        return len(self.short_channel_ids)
+
+    def __iter__(self) -> Iterator[Route]:
+        pubkeys = bytes(self.pubkeys)
+        for i, hop in enumerate(
+            zip(self.short_channel_ids, self.base_fees_msat, self.ppm_fees, self.cltvs)
+        ):
+            yield Route(pubkeys[i * 33 : i * 33 + 33], *hop)
+
+    @overload
+    def __getitem__(self, index: int) -> Route:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[Route]:
+        ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        index = range(len(self))[index]
+        return Route(
+            bytes(self.pubkeys[index * 33 : index * 33 + 33]),
+            self.short_channel_ids[index],
+            self.base_fees_msat[index],
+            self.ppm_fees[index],
+            self.cltvs[index],
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (RouteHintTable, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"RouteHintTable({list(self)!r})"
+
+
+# currency of invoices without one, expiry in seconds without an `x` tag
+DEFAULT_CURRENCY = "bc"
+DEFAULT_EXPIRY = 1000
+
+# serialized fields, in output order
+INVOICE_FIELDS = (
+    "currency",
+    "amount",
+    "date",
+    "payee",
+    "payment_hash",
+    "payment_secret",
+    "description",
+    "description_hash",
+    "expiry",
+    "route_hints",
+    "fallbacks",
+    "features",
+    "unknown_tags",
+    "signature",
+)
+_layout = attrgetter(*INVOICE_FIELDS)
+
+
+@lru_cache(maxsize=None)
+def _json_encoder() -> Callable[[Any], str]:
+    """orjson when it is installed, imported on the first to_json()"""
+    import json
+
+    encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+    try:
+        import orjson
+    except ImportError:  # pragma: no cover
+        return encode
+
+    def dumps(obj: Any) -> str:
+        try:
+            return orjson.dumps(obj).decode()  # pylint: disable=no-member
+        except TypeError:
+            # orjson only takes 64-bit integers, amount and expiry can be larger
+            return encode(obj)
+
+    return dumps
+
+
+def _hex_field(name: str) -> Tuple[property, property]:
+    """field stored as raw bytes in `_{name}`, read as hex, set as hex or bytes"""
+    attr = f"_{name}"
+
+    def fget(self) -> Optional[str]:
+        value = getattr(self, attr)
+        return None if value is None else value.hex()
+
+    def fset(self, value: Union[str, bytes, None]) -> None:
+        if isinstance(value, str):
+            value = bytes.fromhex(value)
+        setattr(self, attr, value)
+
+    def fget_raw(self) -> Optional[bytes]:
+        return getattr(self, attr)
+
+    return property(fget, fset), property(fget_raw, fset)
+
 
 class Bolt11Invoice:
-    payee: Optional[str] = None
-    payment_hash: Optional[str] = None
-    payment_secret: Optional[str] = None
-    description: Optional[str] = None
-    description_hash: Optional[str] = None
-    signature: Optional[str] = None
-    amount: Optional[int] = None
-    route_hints: Optional[List] = None
-    fallbacks: Optional[List] = None
-    unknown_tags: Optional[List] = None
-    date: int = int(time.time())
-    features: Optional[str] = None
-    currency: str = "bc"
-    expiry: int = 1000
+    """
+    Decoded invoice. Payee, payment hash, payment secret, description hash and
+    signature are stored as bytes, available as hex and as `*_raw` bytes.
+    """
+
+    __slots__ = (
+        "_payee",
+        "_payment_hash",
+        "_payment_secret",
+        "description",
+        "_description_hash",
+        "_signature",
+        "amount",
+        "route_hints",
+        "fallbacks",
+        "unknown_tags",
+        "date",
+        "features",
+        "currency",
+        "expiry",
+        # (tag, value) pairs for lnencode
+        "tags",
+    )
+
+    payee, payee_raw = _hex_field("payee")  # type: ignore
+    payment_hash, payment_hash_raw = _hex_field("payment_hash")  # type: ignore
+    payment_secret, payment_secret_raw = _hex_field("payment_secret")  # type: ignore
+    description_hash, description_hash_raw = _hex_field(  # type: ignore
+        "description_hash"
+    )
+    signature, signature_raw = _hex_field("signature")  # type: ignore
+
+    def __init__(self) -> None:
+        self._payee: Optional[bytes] = None
+        self._payment_hash: Optional[bytes] = None
+        self._payment_secret: Optional[bytes] = None
+        self.description: Optional[str] = None
+        self._description_hash: Optional[bytes] = None
+        self._signature: Optional[bytes] = None
+        self.amount: Optional[int] = None
+        self.route_hints: Optional[RouteHintTable] = None
+        self.fallbacks: Optional[List] = None
+        self.unknown_tags: Optional[List] = None
+        self.date: int = int(time.time())
+        self.features: Optional[str] = None
+        self.currency: str = DEFAULT_CURRENCY
+        self.expiry: int = DEFAULT_EXPIRY
+        self.tags: Optional[List] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """every field of the invoice, route hints as dicts"""
+        data = dict(zip(INVOICE_FIELDS, _layout(self)))
+        if self.route_hints is not None:
+            data["route_hints"] = self.route_hints.to_dicts()
+        return data
+
+    def to_json(self) -> str:
+        """compact JSON of to_dict(), with orjson when it is installed"""
+        return _json_encoder()(self.to_dict())
 
     def __str__(self):
-        return json.dumps(self, default=lambda o: o.__dict__)
+        return self.to_json()
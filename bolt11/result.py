@@ -0,0 +1,197 @@
+""" Bolt11 decoding into results instead of exceptions """
+import re
+from enum import Enum
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+from .codec import CHARSET, bech32_polymod, bech32_split, hrp_polymod
+from .decode import InvoiceInput, iter_tags, parse_split, parse_tag
+from .helpers import u5_to_bytes
+from .models import Bolt11Invoice
+from .signature import get_backend
+
+_CURRENCY = re.compile(rb"[^\d]+")
+_AMOUNT = re.compile(rb"\d+[pnum]?")
+_UNPRINTABLE = re.compile(r"[^\x21-\x7e]")
+_UNPRINTABLE_BYTES = re.compile(rb"[^\x21-\x7e]")
+_LETTER = re.compile(rb"[a-zA-Z]")
+_LOWER = re.compile(rb"[a-z]")
+_UPPER = re.compile(rb"[A-Z]")
+_NOT_CHARSET = re.compile(f"[^{CHARSET}]".encode())
+
+
+class ErrorCode(str, Enum):
+    # bech32
+    BAD_INPUT = "bad_input"
+    NOT_ASCII = "not_ascii"
+    UNPRINTABLE = "unprintable"
+    MIXED_CASE = "mixed_case"
+    NO_SEPARATOR = "no_separator"
+    BAD_CHARACTER = "bad_character"
+    BAD_CHECKSUM = "bad_checksum"
+    # human readable part
+    NOT_LIGHTNING = "not_lightning"
+    BAD_AMOUNT = "bad_amount"
+    # data
+    TOO_SHORT = "too_short"
+    MALFORMED_TAG = "malformed_tag"
+    BAD_TAG = "bad_tag"
+    # signature
+    BAD_SIGNATURE = "bad_signature"
+    RECOVERY_FAILED = "recovery_failed"
+
+
+# error code and character offset
+Error = Tuple[ErrorCode, int]
+
+STAGES = {
+    **dict.fromkeys(
+        (
+            ErrorCode.BAD_INPUT,
+            ErrorCode.NOT_ASCII,
+            ErrorCode.UNPRINTABLE,
+            ErrorCode.MIXED_CASE,
+            ErrorCode.NO_SEPARATOR,
+            ErrorCode.BAD_CHARACTER,
+            ErrorCode.BAD_CHECKSUM,
+        ),
+        "bech32",
+    ),
+    ErrorCode.NOT_LIGHTNING: "hrp",
+    ErrorCode.BAD_AMOUNT: "hrp",
+    ErrorCode.TOO_SHORT: "tags",
+    ErrorCode.MALFORMED_TAG: "tags",
+    ErrorCode.BAD_TAG: "tags",
+    ErrorCode.BAD_SIGNATURE: "signature",
+    ErrorCode.RECOVERY_FAILED: "signature",
+}
+
+
+class DecodeResult(NamedTuple):
+    """
+    the invoice, or the error code, the stage it failed in and the character
+    offset in the invoice string the error was found at
+    """
+
+    invoice: Optional[Bolt11Invoice]
+    error: Optional[ErrorCode] = None
+    stage: Optional[str] = None
+    offset: Optional[int] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _failed(error: ErrorCode, offset: int) -> DecodeResult:
+    return DecodeResult(None, error, STAGES[error], offset)
+
+
+def try_decode(a: InvoiceInput) -> DecodeResult:
+    """
+    decode() returning a DecodeResult instead of raising. bad input is
+    rejected without raising exceptions, only errors in the content of
+    well framed tags and in signature recovery are caught.
+    """
+    parts = bech32_split(a)
+    if parts is None:
+        return _failed(*_bech32_error(a))
+    hrp, data = parts
+    error = _frame_error(hrp, data)
+    if error is not None:
+        return _failed(*error)
+
+    end = len(data) - 6 - 104
+    tags = memoryview(data)[:end]
+    signature = u5_to_bytes(memoryview(data)[end:-6])
+    # the timestamp first, then one tag at a time for the offset of a failure
+    pos = 0
+    try:
+        invoice = parse_split(hrp.decode(), tags[:7], signature)
+        for pos, tag, tagdata in iter_tags(tags):
+            parse_tag(invoice, tag, tagdata)
+    except Exception:  # pylint: disable=broad-except
+        return _failed(ErrorCode.BAD_TAG, len(hrp) + 1 + pos)
+
+    code = _signature_error(invoice, hrp + u5_to_bytes(tags), signature)
+    if code is not None:
+        return _failed(code, len(hrp) + 1 + end)
+    return DecodeResult(invoice)
+
+
+def try_decode_many(invoices: Iterable[InvoiceInput]) -> List[DecodeResult]:
+    """try_decode() for every invoice, in input order"""
+    return list(map(try_decode, invoices))
+
+
+def _bech32_error(a: InvoiceInput) -> Error:
+    """why bech32_split() rejected an invoice, only called for failures"""
+    if isinstance(a, str):
+        m = _UNPRINTABLE.search(a)
+        if m:
+            return _unprintable(ord(m.group())), m.start()
+        raw = a.encode()
+    elif isinstance(a, (bytes, bytearray, memoryview)):
+        raw = bytes(a)
+        mb = _UNPRINTABLE_BYTES.search(raw)
+        if mb:
+            return _unprintable(mb.group()[0]), mb.start()
+    else:
+        return ErrorCode.BAD_INPUT, 0
+
+    lower = raw.lower()
+    if lower != raw and raw.upper() != raw:
+        # the first letter not in the case of the first letter
+        first = _LETTER.search(raw)
+        other = _UPPER if first and first.group().islower() else _LOWER
+        mc = other.search(raw)
+        return ErrorCode.MIXED_CASE, mc.start() if mc else 0
+    pos = lower.rfind(b"1")
+    if pos < 1 or pos + 7 > len(lower):
+        return ErrorCode.NO_SEPARATOR, max(pos, 0)
+    mc = _NOT_CHARSET.search(lower, pos + 1)
+    return ErrorCode.BAD_CHARACTER, mc.start() if mc else pos + 1
+
+
+def _unprintable(c: int) -> ErrorCode:
+    return ErrorCode.NOT_ASCII if c > 0x7F else ErrorCode.UNPRINTABLE
+
+
+def _frame_error(hrp: bytes, data: bytes) -> Optional[Error]:
+    """checksum, prefix, amount, length and tag framing of split bech32"""
+    start = len(hrp) + 1
+    if bech32_polymod(data, hrp_polymod(hrp)) != 1:
+        return ErrorCode.BAD_CHECKSUM, start + len(data) - 6
+    if not hrp.startswith(b"ln"):
+        return ErrorCode.NOT_LIGHTNING, 0
+    m = _CURRENCY.search(hrp, 2)
+    if m and m.end() < len(hrp) and not _AMOUNT.fullmatch(hrp, m.end()):
+        return ErrorCode.BAD_AMOUNT, m.end()
+    if len(data) - 6 < 104 + 7:
+        return ErrorCode.TOO_SHORT, start + len(data) - 6
+
+    end = len(data) - 6 - 104
+    pos = 7
+    while pos < end:
+        tag_start = pos
+        pos += 3 + data[pos + 1] * 32 + data[pos + 2]
+        if pos > end:
+            return ErrorCode.MALFORMED_TAG, start + tag_start
+    return None
+
+
+def _signature_error(
+    invoice: Bolt11Invoice, message: bytes, signature: bytes
+) -> Optional[ErrorCode]:
+    """check_signature() without raising, sets the payee of `invoice`"""
+    backend = get_backend()
+    if invoice.payee_raw:
+        if backend.verify(invoice.payee_raw, signature[0:64], message):
+            return None
+        return ErrorCode.BAD_SIGNATURE
+    if signature[64] > 3:
+        return ErrorCode.RECOVERY_FAILED
+    try:
+        invoice.payee = backend.recover(signature[0:64], signature[64], message)
+    except Exception:  # pylint: disable=broad-except
+        return ErrorCode.RECOVERY_FAILED
+    return None
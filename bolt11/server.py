@@ -0,0 +1,288 @@
+""" Bolt11 decode and encode server """
+import ipaddress
+import json
+import os
+import signal
+import socket
+import struct
+import sys
+import threading
+import time
+from functools import lru_cache
+from typing import Any, BinaryIO, Callable, Dict, Optional, Tuple, Union
+
+from .encode import InvoiceSigner
+from .exceptions import Bolt11RequestTooLargeException
+from .models import Bolt11Invoice, _json_encoder
+from .result import try_decode
+from .signature import get_backend
+
+# a Unix socket path or a (host, port) pair
+Address = Union[str, Tuple[str, int]]
+Response = Dict[str, Any]
+
+FRAMINGS = ("ndjson", "length")
+# requests larger than this close the connection
+MAX_REQUEST = 1 << 20
+_LENGTH = struct.Struct(">I")
+# a worker that exits sooner than this after its fork is restarted with a
+# delay, doubling up to the maximum while workers keep crashing
+MIN_WORKER_UPTIME = 1.0
+RESTART_DELAY = 0.1
+MAX_RESTART_DELAY = 30.0
+
+
+def handle_request(payload: bytes, privkey: Optional[str] = None) -> Response:
+    """
+    the response to one request: a JSON object with "op" ("decode", the
+    default, or "encode") and an optional "id" that is sent back, or a bare
+    invoice to decode. encode requests are signed with their "privkey" or
+    with `privkey`.
+    """
+    payload = payload.strip()
+    if not payload.startswith(b"{"):
+        return _decode(payload)
+    try:
+        request = json.loads(payload)
+    except ValueError as exc:
+        return _bad_request(exc)
+    if not isinstance(request, dict):
+        return {"error": "bad_request", "message": "request is not an object"}
+
+    op = request.get("op", "decode")
+    try:
+        if op == "decode":
+            invoice = request["invoice"]
+            if not isinstance(invoice, str):
+                raise TypeError("invoice is not a string")
+            response = _decode(invoice)
+        elif op == "encode":
+            response = _encode(request, privkey)
+        else:
+            response = {"error": "bad_request", "message": f"unknown op {op!r}"}
+    except (ValueError, TypeError, KeyError) as exc:
+        response = _bad_request(exc)
+    if "id" in request:
+        response["id"] = request["id"]
+    return response
+
+
+def _bad_request(exc: Exception) -> Response:
+    return {"error": "bad_request", "message": f"{type(exc).__name__}: {exc}"}
+
+
+def _decode(invoice: Union[str, bytes]) -> Response:
+    result = try_decode(invoice)
+    if result.error is not None:
+        return {
+            "error": result.error.value,
+            "stage": result.stage,
+            "offset": result.offset,
+        }
+    return {"invoice": result.invoice.to_dict()}  # type: ignore
+
+
+def _encode(request: Dict[str, Any], privkey: Optional[str]) -> Response:
+    privkey = request.get("privkey", privkey)
+    if not privkey:
+        return {"error": "bad_request", "message": "no private key"}
+    invoice = Bolt11Invoice()
+    invoice.currency = request.get("currency", invoice.currency)
+    invoice.amount = request.get("amount")
+    invoice.date = request.get("date", invoice.date)
+    invoice.payment_hash = request["payment_hash"]
+    invoice.tags = [_tag(tag, value) for tag, value in request.get("tags", ())]
+    try:
+        payment_request = _signer(privkey).encode(invoice)
+    except Exception as exc:  # pylint: disable=broad-except
+        response = _bad_request(exc)
+        response["error"] = "encode_failed"
+        return response
+    return {"payment_request": payment_request}
+
+
+def _tag(tag: str, value: Any) -> Tuple[str, Any]:
+    """an lnencode() tag from JSON, hex for h and n, r as decoded route hints"""
+    if tag in ("h", "n"):
+        return tag, bytes.fromhex(value)
+    if tag == "r":
+        return tag, [_hop(**hop) for hop in value]
+    return tag, value
+
+
+def _hop(
+    pubkey: str, short_channel_id: str, base_fee_msat: int, ppm_fee: int, cltv: int
+) -> Tuple[bytes, bytes, int, int, int]:
+    block, tx, output = map(int, short_channel_id.split("x"))
+    if not (0 <= block < 1 << 24 and 0 <= tx < 1 << 24 and 0 <= output < 1 << 16):
+        raise ValueError(f"Invalid short channel id {short_channel_id!r}")
+    scid = block << 40 | tx << 16 | output
+    return bytes.fromhex(pubkey), scid.to_bytes(8, "big"), base_fee_msat, ppm_fee, cltv
+
+
+@lru_cache(maxsize=16)
+def _signer(privkey: str) -> InvoiceSigner:
+    return InvoiceSigner(privkey)
+
+
+def serve_connection(
+    conn: socket.socket, framing: str = "ndjson", privkey: Optional[str] = None
+) -> None:
+    """
+    answer requests on a keep-alive connection in the order they were sent,
+    until the client closes it. with "ndjson" framing requests and responses
+    are lines, with "length" a 4 byte big-endian length precedes each.
+    """
+    if framing not in FRAMINGS:
+        raise ValueError(f"Unknown framing {framing!r}")
+    read = _read_line if framing == "ndjson" else _read_frame
+    dumps = _json_encoder()
+
+    def frame(response: Response) -> bytes:
+        data = dumps(response).encode()
+        if framing == "ndjson":
+            return data + b"\n"
+        return _LENGTH.pack(len(data)) + data
+
+    with conn, conn.makefile("rb") as rfile:
+        while True:
+            try:
+                payload = read(rfile)
+            except Bolt11RequestTooLargeException as exc:
+                conn.sendall(frame(_bad_request(exc)))
+                return
+            if payload is None:
+                return
+            if payload.strip():
+                try:
+                    data = frame(handle_request(payload, privkey))
+                except Exception as exc:  # pylint: disable=broad-except
+                    # every request gets a response, later ones are still served
+                    response = _bad_request(exc)
+                    response["error"] = "internal_error"
+                    data = frame(response)
+                conn.sendall(data)
+
+
+def _read_line(rfile: BinaryIO) -> Optional[bytes]:
+    line = rfile.readline(MAX_REQUEST + 1)
+    if len(line) > MAX_REQUEST:
+        raise Bolt11RequestTooLargeException(f"limit is {MAX_REQUEST} bytes")
+    return line or None
+
+
+def _read_frame(rfile: BinaryIO) -> Optional[bytes]:
+    header = rfile.read(_LENGTH.size)
+    if len(header) < _LENGTH.size:
+        return None
+    (length,) = _LENGTH.unpack(header)
+    if length > MAX_REQUEST:
+        raise Bolt11RequestTooLargeException(f"limit is {MAX_REQUEST} bytes")
+    payload = rfile.read(length)
+    return payload if len(payload) == length else None
+
+
+def is_loopback(host: str) -> bool:
+    """whether `host` is localhost or a loopback address"""
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def listen(address: Address) -> socket.socket:
+    """a listening Unix socket for a path, a TCP socket for (host, port)"""
+    if isinstance(address, str):
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            listener.bind(address)
+            listener.listen(socket.SOMAXCONN)
+        except OSError:
+            listener.close()
+            raise
+        return listener
+    return socket.create_server(address, backlog=socket.SOMAXCONN)
+
+
+def serve(
+    listener: socket.socket,
+    workers: Optional[int] = None,
+    framing: str = "ndjson",
+    privkey: Optional[str] = None,
+) -> None:
+    """
+    serve connections of `listener` until SIGTERM or SIGINT. `workers`
+    processes (None: one per cpu) are forked after the imports, the signature
+    backend and the JSON encoder are set up, and all accept connections,
+    each served in a thread. workers that exit are replaced, with a growing
+    delay while they exit right after starting. with one worker
+    connections are served in this process.
+    """
+    if framing not in FRAMINGS:
+        raise ValueError(f"Unknown framing {framing!r}")
+    get_backend()
+    _json_encoder()
+
+    def handler(conn: socket.socket) -> None:
+        serve_connection(conn, framing, privkey)
+
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    address = listener.getsockname()
+    try:
+        if workers == 1:
+            _accept_loop(listener, handler)
+        else:
+            _prefork(listener, handler, workers or os.cpu_count() or 1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        listener.close()
+        if listener.family == socket.AF_UNIX and address:
+            os.unlink(address)
+
+
+def _accept_loop(
+    listener: socket.socket, handler: Callable[[socket.socket], None]
+) -> None:
+    while True:
+        conn, _ = listener.accept()
+        threading.Thread(target=handler, args=(conn,), daemon=True).start()
+
+
+def _prefork(
+    listener: socket.socket, handler: Callable[[socket.socket], None], workers: int
+) -> None:
+    # pid: time of the fork
+    children: Dict[int, float] = {}
+
+    def fork() -> None:
+        pid = os.fork()
+        if pid == 0:
+            # the worker never returns into the caller of serve()
+            try:
+                _accept_loop(listener, handler)
+            finally:
+                os._exit(0)  # pylint: disable=protected-access
+        children[pid] = time.monotonic()
+
+    delay = 0.0
+    try:
+        for _ in range(workers):
+            fork()
+        while True:
+            pid, _ = os.wait()
+            started = children.pop(pid, None)
+            if started is not None and time.monotonic() - started < MIN_WORKER_UPTIME:
+                # don't turn a worker failing at startup into a fork loop
+                delay = min(max(delay * 2, RESTART_DELAY), MAX_RESTART_DELAY)
+                time.sleep(delay)
+            else:
+                delay = 0.0
+            fork()
+    finally:
+        for pid in children:
+            os.kill(pid, signal.SIGTERM)
+        for pid in children:
+            os.waitpid(pid, 0)
@@ -0,0 +1,185 @@
+""" Bolt11 signature backends """
+from collections import OrderedDict
+from hashlib import sha256
+from importlib.util import find_spec
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from .exceptions import Bolt11SignatureRecoveryException
+
+
+class PubkeyCache:
+    """LRU cache of parsed public keys, keyed by the compressed public key"""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._keys: OrderedDict[bytes, Any] = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, pubkey: bytes, parse: Callable[[bytes], Any]) -> Any:
+        """return the cached key for `pubkey`, parsing and caching it on a miss"""
+        with self._lock:
+            key = self._keys.get(pubkey)
+            if key is not None:
+                self._keys.move_to_end(pubkey)
+                self.hits += 1
+                return key
+            self.misses += 1
+        key = parse(pubkey)
+        self.put(pubkey, key)
+        return key
+
+    def put(self, pubkey: bytes, key: Any) -> None:
+        with self._lock:
+            self._keys[pubkey] = key
+            self._keys.move_to_end(pubkey)
+            while len(self._keys) > self.maxsize:
+                self._keys.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._keys.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._keys),
+            "maxsize": self.maxsize,
+        }
+
+
+class SignatureBackend:
+    """Recover and verify compact secp256k1 signatures over a sha256 digest"""
+
+    name = ""
+
+    def __init__(self, pubkey_cache_size: int = 1024):
+        self.pubkey_cache = PubkeyCache(pubkey_cache_size)
+
+    def recover(self, signature: bytes, recovery_id: int, message: bytes) -> bytes:
+        """return the compressed public key that signed `message`"""
+        raise NotImplementedError
+
+    def verify(self, pubkey: bytes, signature: bytes, message: bytes) -> bool:
+        """check `signature` of `message` against a compressed public key"""
+        raise NotImplementedError
+
+
+class Secp256k1Backend(SignatureBackend):
+    """libsecp256k1 through the `secp256k1` bindings"""
+
+    name = "secp256k1"
+
+    def __init__(self, pubkey_cache_size: int = 1024):
+        try:
+            import secp256k1
+        except ImportError as exc:
+            raise ImportError("secp256k1 is not installed") from exc
+        super().__init__(pubkey_cache_size)
+        self._secp256k1 = secp256k1
+        self._ecdsa = secp256k1.PublicKey()
+
+    def recover(self, signature: bytes, recovery_id: int, message: bytes) -> bytes:
+        try:
+            recover_sig = self._ecdsa.ecdsa_recoverable_deserialize(
+                signature, recovery_id
+            )
+            raw_pubkey = self._ecdsa.ecdsa_recover(message, recover_sig)
+        except Exception as exc:
+            raise Bolt11SignatureRecoveryException() from exc
+        key = self._secp256k1.PublicKey(raw_pubkey)
+        pubkey = key.serialize()
+        self.pubkey_cache.put(pubkey, key)
+        return pubkey
+
+    def verify(self, pubkey: bytes, signature: bytes, message: bytes) -> bool:
+        try:
+            key = self.pubkey_cache.get(pubkey, self._parse_pubkey)
+            raw_sig = key.ecdsa_deserialize_compact(signature)
+        except Exception:  # pylint: disable=broad-except
+            return False
+        # libsecp256k1 only accepts lower-S signatures, ecdsa accepts both.
+        _, raw_sig = key.ecdsa_signature_normalize(raw_sig)
+        return key.ecdsa_verify(message, raw_sig)
+
+    def _parse_pubkey(self, pubkey: bytes):
+        return self._secp256k1.PublicKey(pubkey, raw=True)
+
+
+class EcdsaBackend(SignatureBackend):
+    """pure python fallback using `ecdsa`"""
+
+    name = "ecdsa"
+
+    def __init__(self, pubkey_cache_size: int = 1024):
+        import ecdsa
+        import ecdsa.util
+
+        super().__init__(pubkey_cache_size)
+        self._ecdsa = ecdsa
+        self._sigdecode = ecdsa.util.sigdecode_string
+
+    def recover(self, signature: bytes, recovery_id: int, message: bytes) -> bytes:
+        try:
+            keys = self._ecdsa.VerifyingKey.from_public_key_recovery(
+                signature, message, self._ecdsa.SECP256k1, sha256
+            )
+            key = keys[recovery_id]
+        except Exception as exc:
+            raise Bolt11SignatureRecoveryException() from exc
+        pubkey = key.to_string("compressed")
+        self.pubkey_cache.put(pubkey, key)
+        return pubkey
+
+    def verify(self, pubkey: bytes, signature: bytes, message: bytes) -> bool:
+        try:
+            key = self.pubkey_cache.get(pubkey, self._parse_pubkey)
+            return key.verify(signature, message, sha256, sigdecode=self._sigdecode)
+        except Exception:  # pylint: disable=broad-except
+            return False
+
+    def _parse_pubkey(self, pubkey: bytes):
+        return self._ecdsa.VerifyingKey.from_string(pubkey, curve=self._ecdsa.SECP256k1)
+
+
+backends: Dict[str, type] = {
+    Secp256k1Backend.name: Secp256k1Backend,
+    EcdsaBackend.name: EcdsaBackend,
+}
+
+_backend: Optional[SignatureBackend] = None
+
+
+def available_backends() -> List[str]:
+    """names of the backends usable in this environment, preferred first"""
+    names = []
+    if find_spec("secp256k1") is not None:
+        names.append(Secp256k1Backend.name)
+    names.append(EcdsaBackend.name)
+    return names
+
+
+def get_backend() -> SignatureBackend:
+    """the backend used by decode(), the native one if it is installed"""
+    global _backend  # pylint: disable=global-statement
+    if _backend is None:
+        _backend = backends[available_backends()[0]]()
+    return _backend
+
+
+def set_backend(backend: Union[str, SignatureBackend]) -> SignatureBackend:
+    """select the backend used by decode(), by name or instance"""
+    global _backend  # pylint: disable=global-statement
+    if isinstance(backend, str):
+        if backend not in backends:
+            raise ValueError(f"Unknown signature backend '{backend}'")
+        selected = backends[backend]()
+    else:
+        selected = backend
+    _backend = selected
+    return selected
@@ -0,0 +1,157 @@
+""" Bolt11 invoice store """
+import heapq
+import time
+from threading import Lock
+from typing import Callable, Dict, List, Optional, Set, Tuple, Union
+
+from .decode import InvoiceInput
+from .lazy import decode_lazy
+from .models import Bolt11Invoice
+
+Key = Union[str, bytes]
+
+
+def _raw(key: Key) -> bytes:
+    return bytes.fromhex(key) if isinstance(key, str) else key
+
+
+class InvoiceStore:
+    """
+    Thread-safe store of decoded invoices, unique by payment hash, indexed by
+    payee and by expiry time (date + expiry). Expired invoices are evicted
+    from a heap on every add() and by evict(), without scanning the store.
+    Stored invoices are shared between callers and must not be modified.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self.clock = clock
+        self.added = 0
+        self.duplicates = 0
+        self.expired = 0
+        self.evicted = 0
+        self._invoices: Dict[bytes, Bolt11Invoice] = {}
+        self._by_payee: Dict[bytes, Set[bytes]] = {}
+        # (expires_at, payment hash), entries of removed invoices stay until
+        # they are popped or the heap is compacted
+        self._expiry: List[Tuple[int, bytes]] = []
+        self._lock = Lock()
+
+    def add(self, a: Union[InvoiceInput, Bolt11Invoice]) -> bool:
+        """
+        decode and store an invoice. returns False for an invoice whose
+        payment hash is already stored, before checking its signature, and
+        for an expired one. decode errors are raised.
+        """
+        invoice = a if isinstance(a, Bolt11Invoice) else decode_lazy(a)
+        payment_hash = invoice.payment_hash_raw
+        if payment_hash is None:
+            raise ValueError("Invoice has no payment hash")
+        with self._lock:
+            if payment_hash in self._invoices:
+                self.duplicates += 1
+                return False
+
+        # raises for a bad signature, outside of the lock
+        payee = invoice.payee_raw
+        assert payee is not None, "InvoiceStore.add, payee is None"
+        expires_at = invoice.date + invoice.expiry
+        now = self.clock()
+        with self._lock:
+            self._evict(now)
+            if expires_at <= now:
+                self.expired += 1
+                return False
+            if payment_hash in self._invoices:
+                self.duplicates += 1
+                return False
+            self._invoices[payment_hash] = invoice
+            self._by_payee.setdefault(payee, set()).add(payment_hash)
+            heapq.heappush(self._expiry, (expires_at, payment_hash))
+            self.added += 1
+        return True
+
+    def get(self, payment_hash: Key) -> Optional[Bolt11Invoice]:
+        return self._invoices.get(_raw(payment_hash))
+
+    def by_payee(self, payee: Key) -> List[Bolt11Invoice]:
+        """stored invoices of a payee, in no particular order"""
+        with self._lock:
+            hashes = list(self._by_payee.get(_raw(payee), ()))
+            return [self._invoices[h] for h in hashes]
+
+    def next_expiry(self) -> Optional[int]:
+        """the earliest expiry time of the stored invoices"""
+        with self._lock:
+            self._drop_stale()
+            return self._expiry[0][0] if self._expiry else None
+
+    def remove(self, payment_hash: Key) -> Optional[Bolt11Invoice]:
+        with self._lock:
+            invoice = self._remove(_raw(payment_hash))
+            # keep removed entries below half of the heap
+            if len(self._expiry) > 2 * len(self._invoices) + 64:
+                self._expiry = [
+                    (i.date + i.expiry, h) for h, i in self._invoices.items()
+                ]
+                heapq.heapify(self._expiry)
+            return invoice
+
+    def evict(self) -> int:
+        """drop all expired invoices, returns how many were dropped"""
+        with self._lock:
+            return self._evict(self.clock())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._invoices.clear()
+            self._by_payee.clear()
+            self._expiry.clear()
+            self.added = 0
+            self.duplicates = 0
+            self.expired = 0
+            self.evicted = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "added": self.added,
+            "duplicates": self.duplicates,
+            "expired": self.expired,
+            "evicted": self.evicted,
+            "size": len(self._invoices),
+            "payees": len(self._by_payee),
+        }
+
+    def __contains__(self, payment_hash: Key) -> bool:
+        return _raw(payment_hash) in self._invoices
+
+    def __len__(self) -> int:
+        return len(self._invoices)
+
+    def _evict(self, now: float) -> int:
+        evicted = 0
+        while self._expiry and self._expiry[0][0] <= now:
+            expires_at, payment_hash = heapq.heappop(self._expiry)
+            if self._is_current(expires_at, payment_hash):
+                self._remove(payment_hash)
+                evicted += 1
+        self.evicted += evicted
+        return evicted
+
+    def _drop_stale(self) -> None:
+        while self._expiry and not self._is_current(*self._expiry[0]):
+            heapq.heappop(self._expiry)
+
+    def _is_current(self, expires_at: int, payment_hash: bytes) -> bool:
+        invoice = self._invoices.get(payment_hash)
+        return invoice is not None and invoice.date + invoice.expiry == expires_at
+
+    def _remove(self, payment_hash: bytes) -> Optional[Bolt11Invoice]:
+        invoice = self._invoices.pop(payment_hash, None)
+        if invoice is not None:
+            payee = invoice.payee_raw
+            assert payee is not None, "InvoiceStore._remove, payee is None"
+            hashes = self._by_payee[payee]
+            hashes.discard(payment_hash)
+            if not hashes:
+                del self._by_payee[payee]
+        return invoice
@@ -0,0 +1,54 @@
+""" Bolt11 validation in tiers of increasing cost """
+from .codec import bech32_polymod, bech32_split, hrp_polymod
+from .decode import InvoiceInput, decode_split, split_data
+
+# prefix, charset, case and length
+SYNTAX = 1
+# bech32 checksum and tag framing
+CHECKSUM = 2
+# everything decode() checks, including the signature
+SIGNATURE = 3
+
+# timestamp (7 x 5 bits), signature (104) and checksum (6)
+_MIN_DATA_LENGTH = 7 + 104 + 6
+
+
+def validate(invoice: InvoiceInput, level: int = SIGNATURE) -> bool:
+    """
+    check an invoice up to `level` without raising. every level includes the
+    ones before it and costs more, reject with a cheap level first to shed
+    bad input before decoding.
+    """
+    if level not in (SYNTAX, CHECKSUM, SIGNATURE):
+        raise ValueError(f"Unknown validation level {level}")
+
+    parts = bech32_split(invoice)
+    if (
+        parts is None
+        or not parts[0].startswith(b"ln")
+        or len(parts[1]) < _MIN_DATA_LENGTH
+    ):
+        return False
+    if level == SYNTAX:
+        return True
+
+    hrp, data = parts
+    if bech32_polymod(data, hrp_polymod(hrp)) != 1 or not _framed(data[:-6]):
+        return False
+    if level == CHECKSUM:
+        return True
+
+    try:
+        decode_split(*split_data(hrp.decode(), data[:-6]))
+    except Exception:  # pylint: disable=broad-except
+        return False
+    return True
+
+
+def _framed(data: bytes) -> bool:
+    """every tag is a type, a 10 bit length and its data, up to the signature"""
+    end = len(data) - 104
+    pos = 7
+    while pos < end:
+        pos += 3 + data[pos + 1] * 32 + data[pos + 2]
+    return pos == end
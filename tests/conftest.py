@@ -0,0 +1,55 @@
+""" key, invoice factories and fixtures shared by the tests """
+from typing import Callable, Optional
+
+import pytest
+
+from benchmarks.vectors import DATE, PAYEE, PRIVKEY
+from bolt11.codec import bech32_decode, bech32_encode
+from bolt11.encode import lnencode
+from bolt11.models import Bolt11Invoice
+
+__all__ = ["DATE", "PAYEE", "PRIVKEY", "Clock", "reencode", "signed", "unsigned"]
+
+
+class Clock:
+    """a clock for caches and stores that only moves when `now` is set"""
+
+    def __init__(self, now: float):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> Clock:
+    return Clock(DATE)
+
+
+def unsigned(
+    description: str,
+    expiry: Optional[int] = None,
+    payment_hash: bytes = bytes(32),
+    payee: bool = False,
+) -> Bolt11Invoice:
+    """an invoice to encode, with an `n` tag of PAYEE if `payee`"""
+    invoice = Bolt11Invoice()
+    invoice.date = DATE
+    invoice.payment_hash = payment_hash  # type: ignore
+    tags: list = [("n", bytes.fromhex(PAYEE))] if payee else []
+    tags.append(("d", description))
+    if expiry is not None:
+        tags.append(("x", expiry))
+    invoice.tags = tags  # type: ignore
+    return invoice
+
+
+def signed(description: str, **kwargs) -> str:
+    """unsigned() encoded and signed with PRIVKEY"""
+    return lnencode(unsigned(description, **kwargs), PRIVKEY)
+
+
+def reencode(payment_request: str, change: Callable[[bytes], bytes]) -> str:
+    """the invoice with its 5-bit data changed, the checksum made valid"""
+    hrp, data = bech32_decode(payment_request)
+    return bech32_encode(hrp, change(data))
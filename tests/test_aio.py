@@ -0,0 +1,84 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from bolt11.aio import AsyncCodec, async_decode, async_decode_iter, async_lnencode
+from bolt11.decode import decode
+from bolt11.exceptions import Bolt11BadBech32StringException
+from bolt11.models import Bolt11Invoice
+from tests.conftest import PRIVKEY
+
+payment_request = (
+    "lnbc1pvjluezsp5zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zygspp5qqqsyqcyq5rqwzqfqqqsyqcyq5rqwzqfqqqs"
+    "yqcyq5rqwzqfqypqdpl2pkx2ctnv5sxxmmwwd5kgetjypeh2ursdae8g6twvus8g6rfwvs8qun0dfjkxaq9qrsgq357wnc5r2ueh7ck6q9"
+    "3dj32dlqnls087fxdwk8qakdyafkq3yap9us6v52vjjsrvywa6rt52cm9r9zqt8r2t7mlcwspyetp5h2tztugp9lfyql"
+)
+
+
+class CountingExecutor(ThreadPoolExecutor):
+    submitted = 0
+
+    def submit(self, *args, **kwargs):
+        self.submitted += 1
+        return super().submit(*args, **kwargs)
+
+
+class TestAio:
+    def test_async_decode(self):
+        invoice = asyncio.run(async_decode(payment_request))
+        assert str(invoice) == str(decode(payment_request))
+
+    def test_async_decode_fail(self):
+        with pytest.raises(Bolt11BadBech32StringException):
+            asyncio.run(async_decode("lnbc1invalid"))
+
+    def test_async_lnencode(self):
+        invoice = Bolt11Invoice()
+        invoice.date = 1496314658
+        invoice.payment_hash = bytes(32)  # type: ignore
+        invoice.tags = [("d", "async")]  # type: ignore
+        encoded = asyncio.run(async_lnencode(invoice, PRIVKEY))
+        assert decode(encoded).description == "async"
+
+    def test_async_decode_iter(self):
+        async def collect():
+            invoices = [payment_request, "lnbc1invalid", payment_request]
+            return [result async for result in async_decode_iter(invoices, window=2)]
+
+        results = dict(asyncio.run(collect()))
+        assert sorted(results) == [0, 1, 2]
+        assert isinstance(results[1], Bolt11BadBech32StringException)
+        assert results[0].payee == results[2].payee
+
+    def test_concurrency_and_cancel(self):
+        executor = CountingExecutor(max_workers=4)
+        codec = AsyncCodec(executor, concurrency=1)
+
+        async def cancel_waiting():
+            first = asyncio.ensure_future(codec.decode(payment_request))
+            second = asyncio.ensure_future(codec.decode(payment_request))
+            await asyncio.sleep(0)
+            second.cancel()
+            await first
+            with pytest.raises(asyncio.CancelledError):
+                await second
+
+        asyncio.run(cancel_waiting())
+        executor.shutdown()
+        assert executor.submitted == 1
+
+    def test_concurrency_across_loops(self):
+        codec = AsyncCodec(concurrency=1)
+
+        async def decode_two():
+            # the second call waits on the semaphore
+            return await asyncio.gather(
+                codec.decode(payment_request), codec.decode(payment_request)
+            )
+
+        for _ in range(2):
+            invoices = asyncio.run(decode_two())
+            assert [str(invoice) for invoice in invoices] == [
+                str(decode(payment_request))
+            ] * 2
@@ -0,0 +1,87 @@
+import pytest
+
+from bolt11.codec import CHARSET, bech32_decode
+from bolt11.decode import decode
+from bolt11.exceptions import Bolt11BadBech32StringException
+
+np = pytest.importorskip("numpy")
+
+from bolt11.batch import bech32_decode_array, decode_array  # noqa: E402
+
+payment_request = (
+    "lntb20m1pvjluezsp5zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zygshp58yjmdan79s6qqdhdzgynm4zwqd5d7"
+    "xmw5fk98klysy043l2ahrqspp5qqqsyqcyq5rqwzqfqqqsyqcyq5rqwzqfqqqsyqcyq5rqwzqfqypqfpp3x9et2e20v6pu37c5d9va"
+    "x37wxq72un989qrsgqdj545axuxtnfemtpwkc45hx9d2ft7x04mt8q7y6t0k2dge9e7h8kpy9p34ytyslj3yu569aalz2xdk8xkd7ltxql"
+    "d94u8h2esmsmacgpghe9k8"
+)
+payment_request_short = (
+    "lnbc1pvjluezsp5zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zygspp5qqqsyqcyq5rqwzqfqqqsyqcyq5rqwzqfqqqs"
+    "yqcyq5rqwzqfqypqdpl2pkx2ctnv5sxxmmwwd5kgetjypeh2ursdae8g6twvus8g6rfwvs8qun0dfjkxaq9qrsgq357wnc5r2ueh7ck6q9"
+    "3dj32dlqnls087fxdwk8qakdyafkq3yap9us6v52vjjsrvywa6rt52cm9r9zqt8r2t7mlcwspyetp5h2tztugp9lfyql"
+)
+
+invalid = [
+    # mixed case
+    payment_request[:10].upper() + payment_request[10:],
+    # no separator
+    payment_request.replace("1", ""),
+    # not in the charset
+    payment_request[:-1] + "b",
+    # not printable
+    "ln bc" + payment_request[4:],
+    payment_request + "\0",
+    # checksum
+    payment_request[:-1] + CHARSET[(CHARSET.find(payment_request[-1]) + 1) % 32],
+    # too short for a checksum
+    "lnbc1qqqqq",
+    "",
+]
+invoices = [payment_request, payment_request_short, payment_request.upper(), *invalid]
+
+
+def reference(a):
+    try:
+        return decode(a)
+    except Exception as exc:  # pylint: disable=broad-except
+        return exc
+
+
+class TestBatch:
+    def test_bech32_decode_array(self):
+        hrps, data = bech32_decode_array(invoices)
+        assert list(zip(hrps, data))[:3] == [bech32_decode(a) for a in invoices[:3]]
+        assert hrps[3:] == data[3:] == [None] * len(invalid)
+
+    def test_bech32_decode_array_empty(self):
+        assert bech32_decode_array([]) == ([], [])
+
+    @pytest.mark.parametrize("chunksize", [1, 3, 16384])
+    def test_decode_array_matches_decode(self, chunksize):
+        for result, a in zip(decode_array(invoices, chunksize=chunksize), invoices):
+            expected = reference(a)
+            if isinstance(expected, Exception):
+                assert type(result) is type(expected)
+            else:
+                assert result.to_dict() == expected.to_dict()
+
+    def test_decode_array_input(self):
+        results = decode_array(
+            [
+                payment_request.encode(),
+                bytearray(payment_request.encode()),
+                memoryview(payment_request_short.encode()),
+                "lnbcé" + payment_request[4:],
+                None,
+            ]
+        )
+        assert results[0].to_dict() == decode(payment_request).to_dict()
+        assert results[1].to_dict() == decode(payment_request).to_dict()
+        assert results[2].to_dict() == decode(payment_request_short).to_dict()
+        assert isinstance(results[3], Bolt11BadBech32StringException)
+        assert isinstance(results[4], Bolt11BadBech32StringException)
+
+    def test_decode_array_ndarray(self):
+        # numpy strips trailing NULs, compare with what the array holds
+        array = np.array(invoices)
+        results = decode_array(array)
+        assert [type(r) for r in results] == [type(reference(str(a))) for a in array]
@@ -0,0 +1,58 @@
+import pytest
+
+from bolt11.cache import DecodeCache
+from bolt11.exceptions import Bolt11BadBech32StringException
+from tests.conftest import DATE, Clock
+
+# expires after 1000 seconds
+invoice_1 = (
+    "lnbc1pvjluezsp5zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zygspp5qqqsyqcyq5rqwzqfqqqsyqcyq5rqwzqfqqqs"
+    "yqcyq5rqwzqfqypqdpl2pkx2ctnv5sxxmmwwd5kgetjypeh2ursdae8g6twvus8g6rfwvs8qun0dfjkxaq9qrsgq357wnc5r2ueh7ck6q9"
+    "3dj32dlqnls087fxdwk8qakdyafkq3yap9us6v52vjjsrvywa6rt52cm9r9zqt8r2t7mlcwspyetp5h2tztugp9lfyql"
+)
+# expires after 60 seconds
+invoice_2 = (
+    "lnbc2500u1pvjluezsp5zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zygspp5qqqsyqcyq5rqwzqfqqqsyqcyq5rq"
+    "wzqfqqqsyqcyq5rqwzqfqypqdq5xysxxatsyp3k7enxv4jsxqzpu9qrsgquk0rl77nj30yxdy8j9vdx85fkpmdla2087ne0xh8nhedh"
+    "8w27kyke0lp53ut353s06fv3qfegext0eh0ymjpf39tuven09sam30g4vgpfna3rh"
+)
+
+
+class TestDecodeCache:
+    def test_hit(self):
+        cache = DecodeCache(clock=Clock(DATE))
+        invoice = cache.decode(invoice_1)
+        assert cache.decode(invoice_1) is invoice
+        assert invoice_1 in cache
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_expiry(self):
+        clock = Clock(DATE)
+        cache = DecodeCache(clock=clock)
+        cache.decode(invoice_1)
+        cache.decode(invoice_2)
+        clock.now = DATE + 60
+        assert invoice_1 in cache
+        assert invoice_2 not in cache
+        assert cache.purge() == 1
+        assert len(cache) == 1
+        clock.now = DATE + 1000
+        # expired invoices still decode, but are not cached again
+        assert cache.decode(invoice_1).expiry == 1000
+        assert len(cache) == 0
+        assert cache.stats()["expired"] == 2
+
+    def test_eviction(self):
+        cache = DecodeCache(maxsize=1, clock=Clock(DATE))
+        cache.decode(invoice_1)
+        cache.decode(invoice_2)
+        assert invoice_1 not in cache
+        assert invoice_2 in cache
+        assert cache.stats()["evictions"] == 1
+
+    def test_invalid(self):
+        cache = DecodeCache(clock=Clock(DATE))
+        with pytest.raises(Bolt11BadBech32StringException):
+            cache.decode("lnbc1invalid")
+        assert len(cache) == 0
@@ -0,0 +1,38 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+payment_request = (
+    "lnbc1pvjluezsp5zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zygspp5qqqsyqcyq5rqwzqfqqqsyqcyq5rqwzqfqqqs"
+    "yqcyq5rqwzqfqypqdpl2pkx2ctnv5sxxmmwwd5kgetjypeh2ursdae8g6twvus8g6rfwvs8qun0dfjkxaq9qrsgq357wnc5r2ueh7ck6q9"
+    "3dj32dlqnls087fxdwk8qakdyafkq3yap9us6v52vjjsrvywa6rt52cm9r9zqt8r2t7mlcwspyetp5h2tztugp9lfyql"
+)
+
+
+def bolt11(*args, stdin=None):
+    return subprocess.run(
+        [sys.executable, "-m", "bolt11.cli", *args],
+        input=stdin,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+
+
+class TestCli:
+    def test_decode(self):
+        invoice = json.loads(bolt11("decode", payment_request))
+        assert invoice["description"] == "Please consider supporting this project"
+
+    @pytest.mark.parametrize("workers", ["1", "2"])
+    def test_decode_ndjson(self, workers):
+        stdin = f"{payment_request}\n\nlnbc1invalid\n{payment_request}\n"
+        output = bolt11("decode", "-", "--workers", workers, stdin=stdin)
+        records = [json.loads(line) for line in output.splitlines()]
+        assert len(records) == 3
+        assert records[0] == records[2]
+        assert records[0]["date"] == 1496314658
+        assert records[1]["line"] == 3
+        assert records[1]["error"] == "Bolt11BadBech32StringException"
@@ -0,0 +1,67 @@
+import random
+
+import bech32
+import pytest
+
+from bolt11.codec import CHARSET, bech32_decode, bech32_encode
+from bolt11.exceptions import Bolt11BadBech32StringException
+
+payment_request = (
+    "lnbc1pvjluezsp5zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zygspp5qqqsyqcyq5rqwzqfqqqsyqcyq5rqwzqfqqqs"
+    "yqcyq5rqwzqfqypqdpl2pkx2ctnv5sxxmmwwd5kgetjypeh2ursdae8g6twvus8g6rfwvs8qun0dfjkxaq9qrsgq357wnc5r2ueh7ck6q9"
+    "3dj32dlqnls087fxdwk8qakdyafkq3yap9us6v52vjjsrvywa6rt52cm9r9zqt8r2t7mlcwspyetp5h2tztugp9lfyql"
+)
+
+
+class TestCodec:
+    def test_decode_matches_reference(self):
+        hrp, data = bech32_decode(payment_request)
+        assert (hrp, list(data)) == bech32.bech32_decode(payment_request)
+
+    @pytest.mark.parametrize(
+        "convert",
+        [
+            str.upper,
+            str.encode,
+            lambda a: bytearray(a.encode()),
+            lambda a: memoryview(a.encode()),
+        ],
+    )
+    def test_decode_input(self, convert):
+        assert bech32_decode(convert(payment_request)) == bech32_decode(payment_request)
+
+    @pytest.mark.parametrize("length", [0, 1, 90, 1500])
+    def test_roundtrip(self, length):
+        data = [random.randrange(32) for _ in range(length)]
+        encoded = bech32_encode("lnbc", data)
+        assert encoded == bech32.bech32_encode("lnbc", data)
+        assert bech32_decode(encoded) == ("lnbc", bytes(data))
+
+    @pytest.mark.parametrize(
+        "bech",
+        [
+            # mixed case
+            payment_request[:10].upper() + payment_request[10:],
+            # no separator
+            payment_request.replace("1", ""),
+            # empty human readable part
+            payment_request[payment_request.index("1") :],
+            # checksum too short
+            "lnbc1qqqqq",
+            # not in the charset
+            payment_request[:-1] + "b",
+            # not printable
+            "ln bc" + payment_request[4:],
+            "lnbcé" + payment_request[4:],
+            # checksum
+            payment_request[:-1]
+            + CHARSET[(CHARSET.find(payment_request[-1]) + 1) % 32],
+            # not a string or bytes, bytes(n) would allocate n bytes
+            None,
+            10**12,
+            list(payment_request.encode()),
+        ],
+    )
+    def test_decode_fail(self, bech):
+        with pytest.raises(Bolt11BadBech32StringException):
+            bech32_decode(bech)
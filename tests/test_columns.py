@@ -0,0 +1,74 @@
+import pytest
+
+from bolt11.columns import decode_columns
+from bolt11.decode import decode
+from bolt11.exceptions import Bolt11BadBech32StringException
+
+payment_request = (
+    "lnbc1pvjluezsp5zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zygspp5qqqsyqcyq5rqwzqfqqqsyqcyq5rqwzqfqqqs"
+    "yqcyq5rqwzqfqypqdpl2pkx2ctnv5sxxmmwwd5kgetjypeh2ursdae8g6twvus8g6rfwvs8qun0dfjkxaq9qrsgq357wnc5r2ueh7ck6q9"
+    "3dj32dlqnls087fxdwk8qakdyafkq3yap9us6v52vjjsrvywa6rt52cm9r9zqt8r2t7mlcwspyetp5h2tztugp9lfyql"
+)
+expiry_request = (
+    "lnbc2500u1pvjluezsp5zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zygspp5qqqsyqcyq5rqwzqfqqqsyqcyq5rq"
+    "wzqfqqqsyqcyq5rqwzqfqypqdq5xysxxatsyp3k7enxv4jsxqzpu9qrsgquk0rl77nj30yxdy8j9vdx85fkpmdla2087ne0xh8nhedh"
+    "8w27kyke0lp53ut353s06fv3qfegext0eh0ymjpf39tuven09sam30g4vgpfna3rh"
+)
+routes_request = (
+    "lnbc20m1pvjluezsp5zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zygspp5qqqsyqcyq5rqwzqfqqqsyqcyq5rqwzqfqqqs"
+    "yqcyq5rqwzqfqypqhp58yjmdan79s6qqdhdzgynm4zwqd5d7xmw5fk98klysy043l2ahrqsfpp3qjmp7lwpagxun9pygexvgpjdc4jdj85fr9"
+    "yq20q82gphp2nflc7jtzrcazrra7wwgzxqc8u7754cdlpfrmccae92qgzqvzq2ps8pqqqqqqpqqqqq9qqqvpeuqafqxu92d8lr6fvg0r5gv0"
+    "heeeqgcrqlnm6jhphu9y00rrhy4grqszsvpcgpy9qqqqqqgqqqqq7qqzq9qrsgqdfjcdk6w3ak5pca9hwfwfh63zrrz06wwfya0ydlzpgzxk"
+    "n5xagsqz7x9j4jwe7yj7vaf2k9lqsdk45kts2fd0fkr28am0u4w95tt2nsq76cqw0"
+)
+invoices = [
+    payment_request,
+    "garbage",
+    expiry_request,
+    routes_request.upper(),
+    payment_request[:-1],
+]
+
+
+class TestColumns:
+    def test_matches_decode(self):
+        columns = decode_columns(invoices)
+        assert len(columns) == len(invoices)
+        assert set(columns.errors) == {1, 4}
+        assert isinstance(columns.errors[1], Bolt11BadBech32StringException)
+        for i, a in enumerate(invoices):
+            if i in columns.errors:
+                assert columns.valid[i] == 0
+                assert columns.payee[i * 33 : i * 33 + 33] == bytes(33)
+                continue
+            invoice = decode(a)
+            assert columns.valid[i] == 1
+            assert columns.currencies[columns.currency[i]] == invoice.currency
+            assert columns.amount[i] == (invoice.amount or 0)
+            assert columns.date[i] == invoice.date
+            assert columns.expiry[i] == invoice.expiry
+            assert columns.route_hints[i] == len(invoice.route_hints or ())
+            assert columns.payee[i * 33 : i * 33 + 33] == invoice.payee_raw
+            assert (
+                columns.payment_hash[i * 32 : i * 32 + 32] == invoice.payment_hash_raw
+            )
+        assert columns.expiry[2] == 60
+        assert columns.route_hints[3] == 2
+
+    def test_empty(self):
+        columns = decode_columns([])
+        assert len(columns) == 0
+        assert not columns.payee
+
+    def test_to_numpy(self):
+        np = pytest.importorskip("numpy")
+        columns = decode_columns(invoices)
+        arrays = columns.to_numpy()
+        assert arrays["valid"].tolist() == [True, False, True, True, False]
+        assert arrays["currency"].tolist() == ["bc"] * 5
+        assert arrays["amount"].tolist() == list(columns.amount)
+        assert arrays["route_hints"].tolist() == [0, 0, 0, 2, 0]
+        assert arrays["payee"][0] == decode(payment_request).payee_raw
+        assert arrays["payment_hash"].dtype == np.dtype("S32")
+        with pytest.raises(BufferError):
+            columns.append(payment_request)
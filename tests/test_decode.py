@@ -307,3 +307,22 @@ class TestDecode:
         if description_hash:
             assert decoded.description_hash == description_hash
         assert decoded.expiry == expiry
+
+
+class TestDecodeBytes:
+    payment_request = (
+        "lnbc1pvjluezsp5zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zygspp5qqqsyqcyq5rqwzqfqqqsyqcyq5rqwzqfqqqs"
+        "yqcyq5rqwzqfqypqdpl2pkx2ctnv5sxxmmwwd5kgetjypeh2ursdae8g6twvus8g6rfwvs8qun0dfjkxaq9qrsgq357wnc5r2ueh7ck6q9"
+        "3dj32dlqnls087fxdwk8qakdyafkq3yap9us6v52vjjsrvywa6rt52cm9r9zqt8r2t7mlcwspyetp5h2tztugp9lfyql"
+    )
+
+    @pytest.mark.parametrize("convert", [bytes, bytearray, memoryview])
+    def test_decode_bytes(self, convert):
+        decoded = decode(convert(self.payment_request.encode()))
+        assert str(decoded) == str(decode(self.payment_request))
+
+    def test_decode_memoryview_slice(self):
+        buffer = b"\n".join([b"garbage", self.payment_request.encode(), b""])
+        start = buffer.index(b"\n") + 1
+        view = memoryview(buffer)[start : buffer.index(b"\n", start)]
+        assert decode(view).payment_hash == decode(self.payment_request).payment_hash
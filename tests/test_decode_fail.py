@@ -1,9 +1,11 @@
 import pytest
 
+from bolt11.codec import bech32_decode, bech32_encode
 from bolt11.decode import decode
 from bolt11.exceptions import (
     Bolt11BadBech32StringException,
     Bolt11InvalidAmountException,
+    Bolt11MalformedTagException,
 )
 
 
@@ -74,6 +76,10 @@ class TestDecodeFail:
         with pytest.raises(Bolt11BadBech32StringException):
             decode(payment_request)
 
+    def test_decode_fail_non_ascii_bytes(self):
+        with pytest.raises(Bolt11BadBech32StringException):
+            decode("lnbc1\u00e9".encode())
+
     @pytest.mark.parametrize(
         "payment_request",
         [
@@ -88,3 +94,16 @@ class TestDecodeFail:
     def test_decode_fail_invalid_amount(self, payment_request):
         with pytest.raises(Bolt11InvalidAmountException):
             decode(payment_request)
+
+    def test_decode_fail_malformed_tag(self):
+        hrp, data = bech32_decode(
+            "lnbc1pvjluezsp5zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zygspp5qqqsyqcyq5rqwzqfqqqsyqcyq5rqwzqfqqqs"
+            "yqcyq5rqwzqfqypqdpl2pkx2ctnv5sxxmmwwd5kgetjypeh2ursdae8g6twvus8g6rfwvs8qun0dfjkxaq9qrsgq357wnc5r2ueh7ck6q9"
+            "3dj32dlqnls087fxdwk8qakdyafkq3yap9us6v52vjjsrvywa6rt52cm9r9zqt8r2t7mlcwspyetp5h2tztugp9lfyql"
+        )
+        # timestamp followed by a tag header announcing 1023 groups of data
+        payment_request = bech32_encode(
+            hrp, data[:7] + bytes([1, 31, 31]) + data[-104:]
+        )
+        with pytest.raises(Bolt11MalformedTagException):
+            decode(payment_request)
@@ -0,0 +1,34 @@
+import pytest
+
+from bolt11.decode import decode, decode_iter, decode_many
+from bolt11.exceptions import Bolt11BadBech32StringException
+
+payment_requests = [
+    "lnbc1pvjluezsp5zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zygspp5qqqsyqcyq5rqwzqfqqqsyqcyq5rqwzqfqqqs"
+    "yqcyq5rqwzqfqypqdpl2pkx2ctnv5sxxmmwwd5kgetjypeh2ursdae8g6twvus8g6rfwvs8qun0dfjkxaq9qrsgq357wnc5r2ueh7ck6q9"
+    "3dj32dlqnls087fxdwk8qakdyafkq3yap9us6v52vjjsrvywa6rt52cm9r9zqt8r2t7mlcwspyetp5h2tztugp9lfyql",
+    "lnbc1invalid",
+    "lnbc2500u1pvjluezsp5zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zygspp5qqqsyqcyq5rqwzqfqqqsyqcyq5rq"
+    "wzqfqqqsyqcyq5rqwzqfqypqdq5xysxxatsyp3k7enxv4jsxqzpu9qrsgquk0rl77nj30yxdy8j9vdx85fkpmdla2087ne0xh8nhedh"
+    "8w27kyke0lp53ut353s06fv3qfegext0eh0ymjpf39tuven09sam30g4vgpfna3rh",
+]
+
+
+class TestDecodeMany:
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_decode_many(self, workers):
+        results = decode_many(payment_requests * 3, workers=workers, chunksize=2)
+        assert len(results) == 9
+        for payment_request, result in zip(payment_requests * 3, results):
+            if payment_request == "lnbc1invalid":
+                assert isinstance(result, Bolt11BadBech32StringException)
+            else:
+                assert str(result) == str(decode(payment_request))
+
+    def test_decode_iter(self):
+        results = decode_iter(iter(payment_requests), workers=1)
+        assert [type(result).__name__ for result in results] == [
+            "Bolt11Invoice",
+            "Bolt11BadBech32StringException",
+            "Bolt11Invoice",
+        ]
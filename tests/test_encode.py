@@ -0,0 +1,127 @@
+import pytest
+
+from benchmarks.vectors import SPEC_VECTORS, encodable
+from bolt11.decode import decode
+from bolt11.encode import InvoiceSigner, lnencode
+from tests.conftest import DATE, PAYEE, PRIVKEY, unsigned
+
+# lnencode() output of the pre-rewrite bitstring encoder for the spec vectors,
+# reduced to the fields lnencode() supports (see encoded())
+BASELINE = {
+    "invoice_1": (
+        "lnbc0n1pvjluezpp5qqqsyqcyq5rqwzqfqqqsyqcyq5rqwzqfqqqsyqcyq5rqwzqfqypqdpl2pkx2ctnv5sxxmmwwd5kgetjypeh"
+        "2ursdae8g6twvus8g6rfwvs8qun0dfjkxaqng99255gr2hspnjkgxls97640dtxzud8v05r4h5kv6n7s2j2prsxxgud0yx6zcn47"
+        "ja6kt28tz25vq979l7qdeulkvyeg4txx7zwmkgqrm8zwp"
+    ),
+    "invoice_2": (
+        "lnbc2500000n1pvjluezpp5qqqsyqcyq5rqwzqfqqqsyqcyq5rqwzqfqqqsyqcyq5rqwzqfqypqdq5xysxxatsyp3k7enxv4jsxq"
+        "zpuy6lch3tqtmeljskxzg0qknx9mvt9pffuu50ecasqycxmn78ekj2zj7lr9aufpnrsrjqrl3hran2ddrrmt7rm9mplnh8kv8fan"
+        "d6phqsp7u8pve"
+    ),
+    "invoice_3": (
+        "lnbc2500000n1pvjluezpp5qqqsyqcyq5rqwzqfqqqsyqcyq5rqwzqfqqqsyqcyq5rqwzqfqypqdpquwpc4curk03c9wlrswe78q"
+        "4eyqc7d8d0xqzpu8e8upnzhenv9we9q56h5tpc8cgp5uphg6c4q95n7v24tvvpyj7esfvk77522zs8qqlqnft9f6w58cup6jvffe"
+        "eyp7rqmrklsu0jczqcqs7csmf"
+    ),
+    "invoice_4": (
+        "lnbc20000000n1pvjluezpp5qqqsyqcyq5rqwzqfqqqsyqcyq5rqwzqfqqqsyqcyq5rqwzqfqypqhp58yjmdan79s6qqdhdzgynm"
+        "4zwqd5d7xmw5fk98klysy043l2ahrqsh5ra8u4sy803gwcd8v0mlzg0h79mqapylgzuhy2d303q3lfqm7w3ddy7qwmprnkdqcdny"
+        "4k9w36eyyhhv6qdxstz50lx8w3l3vw2xggpnucsxl"
+    ),
+    "invoice_5": (
+        "lntb20000000n1pvjluezpp5qqqsyqcyq5rqwzqfqqqsyqcyq5rqwzqfqqqsyqcyq5rqwzqfqypqhp58yjmdan79s6qqdhdzgynm"
+        "4zwqd5d7xmw5fk98klysy043l2ahrqsw5ngq0n9dws7cnxjaktd64ml52pgl3yf8gz5y7uj3pvp978np93xvhyzwzld0sqhvqasr"
+        "f456yvtz7wgng38v6haznwvxcrqjkj69dcpygfack"
+    ),
+    "invoice_6": (
+        "lnbc20000000n1pvjluezpp5qqqsyqcyq5rqwzqfqqqsyqcyq5rqwzqfqqqsyqcyq5rqwzqfqypqhp58yjmdan79s6qqdhdzgynm"
+        "4zwqd5d7xmw5fk98klysy043l2ahrqsr9yq20q82gphp2nflc7jtzrcazrra7wwgzxqc8u7754cdlpfrmccae92qgzqvzq2ps8pq"
+        "qqqqqpqqqqq9qqqvpeuqafqxu92d8lr6fvg0r5gv0heeeqgcrqlnm6jhphu9y00rrhy4grqszsvpcgpy9qqqqqqgqqqqq7qqzq05"
+        "npn4g9l5an8zwk7g9p68vyccdatzsp7x2g852hawntm6pwxyk8z7awvn98uyyfc2puh4v3p33p7r6fs74x7ug85cdc8ramqzzv0z"
+        "cqkg9f2r"
+    ),
+    "invoice_7": (
+        "lnbc20000000n1pvjluezpp5qqqsyqcyq5rqwzqfqqqsyqcyq5rqwzqfqqqsyqcyq5rqwzqfqypqhp58yjmdan79s6qqdhdzgynm"
+        "4zwqd5d7xmw5fk98klysy043l2ahrqsh5ra8u4sy803gwcd8v0mlzg0h79mqapylgzuhy2d303q3lfqm7w3ddy7qwmprnkdqcdny"
+        "4k9w36eyyhhv6qdxstz50lx8w3l3vw2xggpnucsxl"
+    ),
+    "invoice_8": (
+        "lnbc20000000n1pvjluezpp5qqqsyqcyq5rqwzqfqqqsyqcyq5rqwzqfqqqsyqcyq5rqwzqfqypqhp58yjmdan79s6qqdhdzgynm"
+        "4zwqd5d7xmw5fk98klysy043l2ahrqsfppqw508d6qejxtdg4y5r3zarvary0c5xw7kr9ugcac95qg3jvzxct9fsr7lt9xnl9lqr"
+        "qncgkj7zrtst6eluu5yuhmczs4wnznfevexmh5lsvfyzmxhd4jxtuf9etzrsnd364lrr6sqtswvq0"
+    ),
+    "invoice_9": (
+        "lnbc20000000n1pvjluezpp5qqqsyqcyq5rqwzqfqqqsyqcyq5rqwzqfqqqsyqcyq5rqwzqfqypqhp58yjmdan79s6qqdhdzgynm"
+        "4zwqd5d7xmw5fk98klysy043l2ahrqsfp4qrp33g0q5c5txsp9arysrx4k6zdkfs4nce4xj0gdcccefvpysxf3qmrwmgv6l3fdzx"
+        "glpf6z093fjxptu3uf5tu8vndvwlyhskn7x496qrs2rnq05z7vykzfhrjc50mms9ny4ww68ymj9s57kgyn0wydhswqpjgvslu"
+    ),
+    "invoice_10": (
+        "lnbc9678785340n1pwmna7lpp5gc3xfm08u9qy06djf8dfflhugl6p7lgza6dsjxq454gxhj9t7a0sd8dgfkx7cmtwd68yetpd5s"
+        "9xar0wfjn5gpc8qhrsdfq24f5ggrxdaezqsnvda3kkum5wfjkzmfqf3jkgem9wgsyuctwdus9xgrcyqcjcgpzgfskx6eqf9hzqnt"
+        "eypzxz7fzypfhg6trddjhygrcyqezcgpzfysywmm5ypxxjemgw3hxjmn8yptk7untd9hxwg3q2d6xjcmtv4ezq7pqxgsxzmnyyqc"
+        "jqmt0wfjjq6t5v4khxxqyjw5qrzjq0gxwkzc8w6323m55m4jyxcjwmy7stt9hwkwe2qxmy8zpsgg7jcuwz87fcqqeuqqqyqqqqlg"
+        "qqqqn3qq9qes772vsj6tnnf6m0u2xp39lqvk88hyxe82h5r6sugnsnd9mk0r5yh4sf5cne55xav8zavyd55kqs9djz3du8srf445"
+        "d8rg8a5gtdn0gqlnhllq"
+    ),
+}
+
+
+def encoded(payment_request: str) -> str:
+    """re-encode a decoded invoice with the fields lnencode() supports"""
+    decoded = decode(payment_request)
+    addr = encodable(decoded)
+    addr.amount = decoded.amount
+    for fallback in decoded.fallbacks or ():
+        # base58 fallbacks do not decode to their address
+        if fallback.startswith(decoded.currency + "1"):
+            addr.tags.append(("f", fallback))  # type: ignore
+    return lnencode(addr, PRIVKEY)
+
+
+class TestEncode:
+    @pytest.mark.parametrize("expiry", [0, 1, 60, 3600, 2**40])
+    def test_lnencode(self, expiry):
+        decoded = decode(lnencode(unsigned("coffee", expiry), PRIVKEY))
+        assert decoded.date == DATE
+        assert decoded.payment_hash == bytes(32).hex()
+        assert decoded.description == "coffee"
+        assert decoded.expiry == expiry
+        assert decoded.payee == PAYEE
+
+    @pytest.mark.parametrize("name, payment_request", SPEC_VECTORS)
+    def test_baseline_output(self, name, payment_request):
+        assert encoded(payment_request) == BASELINE[name]
+
+    def test_decoded_route_hints(self):
+        # the Route tuples of a decoded invoice, short channel id as int
+        routes = list(decode(BASELINE["invoice_6"]).route_hints or ())
+        addr = unsigned("coffee")
+        addr.tags.append(("r", routes))  # type: ignore
+        encoded = lnencode(addr, PRIVKEY)
+        assert list(decode(encoded).route_hints or ()) == routes
+        # the same hops with the short channel id as 8 bytes
+        addr.tags[-1] = (  # type: ignore
+            "r",
+            [
+                (*route[:1], route.scid.to_bytes(8, "big"), *route[2:])
+                for route in routes
+            ],
+        )
+        assert lnencode(addr, PRIVKEY) == encoded
+
+    def test_lnencode_fail(self):
+        addr = unsigned("coffee")
+        addr.tags.append(("d", "tea"))  # type: ignore
+        with pytest.raises(ValueError):
+            lnencode(addr, PRIVKEY)
+
+    @pytest.mark.parametrize("workers", [1, 4])
+    def test_invoice_signer(self, workers):
+        signer = InvoiceSigner(PRIVKEY)
+        addrs = [unsigned(f"invoice {i}") for i in range(8)]
+        addrs[3].tags = [("d", "a"), ("h", bytes(32))]  # type: ignore
+        results = signer.encode_many(addrs, workers=workers)
+        assert isinstance(results[3], ValueError)
+        for i, result in enumerate(results):
+            if i != 3:
+                assert result == lnencode(addrs[i], PRIVKEY)
@@ -0,0 +1,55 @@
+import pytest
+
+from bolt11.decode import decode
+from bolt11.file import decode_file
+
+payment_request = (
+    "lnbc1pvjluezsp5zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zygspp5qqqsyqcyq5rqwzqfqqqsyqcyq5rqwzqfqqqs"
+    "yqcyq5rqwzqfqypqdpl2pkx2ctnv5sxxmmwwd5kgetjypeh2ursdae8g6twvus8g6rfwvs8qun0dfjkxaq9qrsgq357wnc5r2ueh7ck6q9"
+    "3dj32dlqnls087fxdwk8qakdyafkq3yap9us6v52vjjsrvywa6rt52cm9r9zqt8r2t7mlcwspyetp5h2tztugp9lfyql"
+)
+
+lines = [
+    payment_request,
+    "",
+    "garbage",
+    "  " + payment_request + "\r",
+    payment_request.upper(),
+    payment_request[:-1],
+]
+
+
+@pytest.fixture
+def archive(tmp_path):
+    path = tmp_path / "invoices.txt"
+    path.write_bytes("\n".join(lines * 5).encode())
+    return path
+
+
+def check(records, content: bytes):
+    expected = [line.strip() for line in lines * 5 if line.strip()]
+    assert len(records) == len(expected)
+    for (offset, result), invoice in zip(records, expected):
+        assert content[offset : offset + len(invoice)] == invoice.encode()
+        try:
+            decoded = decode(invoice)
+        except Exception as exc:  # pylint: disable=broad-except
+            assert type(result) is type(exc)
+        else:
+            assert result.to_dict() == decoded.to_dict()
+
+
+class TestDecodeFile:
+    def test_decode_file(self, archive):
+        check(list(decode_file(archive)), archive.read_bytes())
+
+    @pytest.mark.parametrize("rangesize", [1, 300, 1 << 20])
+    def test_workers(self, archive, rangesize):
+        records = list(decode_file(str(archive), workers=2, rangesize=rangesize))
+        check(records, archive.read_bytes())
+
+    def test_empty(self, tmp_path):
+        path = tmp_path / "empty.txt"
+        path.write_bytes(b"")
+        assert not list(decode_file(path))
+        assert not list(decode_file(path, workers=2))
@@ -1,5 +1,10 @@
 """ Bolt11 test helpers """
 
+import pytest
+from bech32 import convertbits
+
+from bolt11.helpers import bytes_to_u5, int_to_u5, u5_to_bytes, u5_to_int
+
 # from decimal import Decimal
 
 # import pytest
@@ -23,3 +28,24 @@
 #         shortened = shorten_amount(Decimal(amount))
 #         unshortened = unshorten_amount(shortened)
 #         assert amount == unshortened
+
+
+class TestU5:
+    @pytest.mark.parametrize("length", range(0, 42))
+    def test_u5_to_bytes(self, length):
+        data = [(i * 7 + 3) % 32 for i in range(length)]
+        padded = bytes(convertbits(data, 5, 8, pad=True) or [])
+        assert u5_to_bytes(data) == padded
+        assert u5_to_bytes(data, pad=False) == padded[: length * 5 // 8]
+        assert u5_to_int(data) == int.from_bytes(padded, "big") >> (-length * 5 % 8)
+
+    @pytest.mark.parametrize("length", range(0, 42))
+    def test_bytes_to_u5(self, length):
+        data = bytes((i * 37 + 11) % 256 for i in range(length))
+        assert bytes_to_u5(data) == convertbits(data, 8, 5, pad=True)
+        assert u5_to_bytes(bytes_to_u5(data), pad=False) == data
+
+    def test_int_to_u5(self):
+        assert int_to_u5(0, 0) == []
+        assert int_to_u5(1496314658, 7) == [1, 12, 18, 31, 28, 25, 2]
+        assert u5_to_int(int_to_u5(1496314658, 7)) == 1496314658
@@ -0,0 +1,72 @@
+import subprocess
+import sys
+
+import pytest
+
+# imported on first use only
+heavy = (
+    "base58",
+    "concurrent.futures",
+    "ecdsa",
+    "json",
+    "multiprocessing",
+    "numpy",
+    "orjson",
+    "secp256k1",
+)
+# cumulative import time of bolt11.decode, best of three runs
+budget_us = 60_000
+
+
+def imported(statement: str) -> set:
+    code = f"import sys; {statement}; print('\\n'.join(sys.modules))"
+    output = subprocess.check_output([sys.executable, "-c", code], text=True)
+    return set(output.split())
+
+
+def import_time(module: str) -> int:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    # the last line is the module itself: self | cumulative | name
+    return int(result.stderr.splitlines()[-1].split("|")[1])
+
+
+class TestImport:
+    @pytest.mark.parametrize(
+        "module",
+        [
+            "bolt11.decode",
+            "bolt11.encode",
+            "bolt11.cache",
+            "bolt11.lazy",
+            "bolt11.metrics",
+            "bolt11.validate",
+        ],
+    )
+    def test_no_heavy_dependencies(self, module):
+        assert not imported(f"import {module}") & set(heavy)
+
+    def test_cli_only_click(self):
+        modules = imported("import bolt11.cli")
+        assert "click" in modules
+        assert "bolt11.decode" not in modules
+        assert not modules & set(heavy)
+
+    def test_heavy_dependencies_on_use(self):
+        modules = imported(
+            "from bolt11.decode import decode; "
+            "decode('lnbc1pvjluezsp5zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zygspp5qqqsyqcyq5rqwzqfqqqsyq"
+            "cyq5rqwzqfqqqsyqcyq5rqwzqfqypqdpl2pkx2ctnv5sxxmmwwd5kgetjypeh2ursdae8g6twvus8g6rfwvs8qun0dfjkxaq9qrs"
+            "gq357wnc5r2ueh7ck6q93dj32dlqnls087fxdwk8qakdyafkq3yap9us6v52vjjsrvywa6rt52cm9r9zqt8r2t7mlcwspyetp5h2t"
+            "ztugp9lfyql').to_json()"
+        )
+        assert "secp256k1" in modules or "ecdsa" in modules
+        assert "orjson" in modules or "json" in modules
+
+    def test_import_time_budget(self):
+        best = min(import_time("bolt11.decode") for _ in range(3))
+        assert best < budget_us, f"import bolt11.decode took {best} us"
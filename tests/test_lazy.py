@@ -0,0 +1,103 @@
+import pickle
+
+import pytest
+
+from bolt11.codec import bech32_decode, bech32_encode
+from bolt11.decode import decode
+from bolt11.exceptions import (
+    Bolt11MalformedTagException,
+    Bolt11SignatureVerifyException,
+)
+from bolt11.lazy import LazyBolt11Invoice, decode_lazy
+from bolt11.signature import get_backend, set_backend
+from tests.conftest import PAYEE, signed
+
+payment_request = (
+    "lntb20m1pvjluezsp5zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zygshp58yjmdan79s6qqdhdzgynm4zwqd5d7"
+    "xmw5fk98klysy043l2ahrqspp5qqqsyqcyq5rqwzqfqqqsyqcyq5rqwzqfqqqsyqcyq5rqwzqfqypqfpp3x9et2e20v6pu37c5d9va"
+    "x37wxq72un989qrsgqdj545axuxtnfemtpwkc45hx9d2ft7x04mt8q7y6t0k2dge9e7h8kpy9p34ytyslj3yu569aalz2xdk8xkd7ltxql"
+    "d94u8h2esmsmacgpghe9k8"
+)
+
+
+class CountingBackend:
+    def __init__(self, backend):
+        self.backend = backend
+        self.calls = 0
+
+    def recover(self, *args):
+        self.calls += 1
+        return self.backend.recover(*args)
+
+    def verify(self, *args):
+        self.calls += 1
+        return self.backend.verify(*args)
+
+
+@pytest.fixture
+def backend():
+    default = get_backend()
+    counting = CountingBackend(default)
+    set_backend(counting)  # type: ignore
+    yield counting
+    set_backend(default)
+
+
+class TestLazy:
+    def test_lazy_matches_decode(self):
+        lazy = decode_lazy(payment_request)
+        decoded = decode(payment_request)
+        assert isinstance(lazy, LazyBolt11Invoice)
+        for name in (
+            "currency",
+            "amount",
+            "date",
+            "signature",
+            "payment_hash",
+            "payment_secret",
+            "description",
+            "description_hash",
+            "features",
+            "fallbacks",
+            "route_hints",
+            "expiry",
+            "payee",
+        ):
+            assert getattr(lazy, name) == getattr(decoded, name)
+        assert str(lazy) == str(decoded)
+
+    def test_pickle(self, backend):
+        lazy = pickle.loads(pickle.dumps(decode_lazy(payment_request)))
+        assert backend.calls == 0
+        assert str(lazy) == str(decode(payment_request))
+        verified = decode_lazy(payment_request)
+        verified.verify()
+        assert str(pickle.loads(pickle.dumps(verified))) == str(verified)
+
+    def test_signature_checked_on_payee(self, backend):
+        lazy = decode_lazy(payment_request)
+        assert lazy.payment_hash
+        assert lazy.amount == 2_000_000_000
+        assert backend.calls == 0
+        assert lazy.payee == PAYEE
+        assert lazy.payee == PAYEE
+        lazy.verify()
+        assert backend.calls == 1
+
+    def test_verify_fails(self):
+        hrp, data = bech32_decode(signed("lazy", payee=True))
+        # change the description, keeping the signature
+        tampered = bech32_encode(
+            hrp, data[:-105] + bytes([data[-105] ^ 16]) + data[-104:]
+        )
+        lazy = decode_lazy(tampered)
+        assert lazy.description != "lazy"
+        with pytest.raises(Bolt11SignatureVerifyException):
+            lazy.verify()
+        with pytest.raises(Bolt11SignatureVerifyException):
+            assert lazy.payee
+
+    def test_malformed_tag_fails_early(self):
+        hrp, data = bech32_decode(payment_request)
+        with pytest.raises(Bolt11MalformedTagException):
+            decode_lazy(bech32_encode(hrp, data[:7] + bytes([1, 31, 31]) + data[-104:]))
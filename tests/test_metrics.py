@@ -0,0 +1,84 @@
+import pytest
+
+from bolt11.cache import DecodeCache
+from bolt11.decode import decode
+from bolt11.encode import lnencode
+from bolt11.exceptions import Bolt11BadBech32StringException
+from bolt11.metrics import Metrics, get_metrics, set_metrics
+from bolt11.models import Bolt11Invoice
+from tests.conftest import PRIVKEY
+
+payment_request = (
+    "lnbc1pvjluezsp5zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zygspp5qqqsyqcyq5rqwzqfqqqsyqcyq5rqwzqfqqqs"
+    "yqcyq5rqwzqfqypqdpl2pkx2ctnv5sxxmmwwd5kgetjypeh2ursdae8g6twvus8g6rfwvs8qun0dfjkxaq9qrsgq357wnc5r2ueh7ck6q9"
+    "3dj32dlqnls087fxdwk8qakdyafkq3yap9us6v52vjjsrvywa6rt52cm9r9zqt8r2t7mlcwspyetp5h2tztugp9lfyql"
+)
+
+
+@pytest.fixture
+def recorded():
+    events = []
+    metrics = set_metrics(Metrics(lambda *event: events.append(event)))
+    yield metrics, events
+    set_metrics(None)
+
+
+class TestMetrics:
+    def test_disabled_by_default(self):
+        assert get_metrics() is None
+
+    def test_decode(self, recorded):
+        metrics, events = recorded
+        decode(payment_request)
+        decode(payment_request)
+        stats = metrics.stats()
+        assert stats["calls"] == {"decode": 2}
+        assert list(stats["seconds"]["decode"]) == [
+            "bech32",
+            "unpack",
+            "tags",
+            "signature",
+        ]
+        assert stats["tags"] == {"s": 2, "p": 2, "d": 2, "9": 2}
+        assert stats["counters"] == {"signature_recover": 2}
+        assert "hits" in stats["pubkey_cache"]
+        operation, laps, tags, error = events[0]
+        assert operation == "decode"
+        assert set(laps) == set(stats["seconds"]["decode"])
+        assert tags == ["s", "p", "d", "9"]
+        assert error is None
+
+    def test_decode_error(self, recorded):
+        metrics, events = recorded
+        with pytest.raises(Bolt11BadBech32StringException):
+            decode(payment_request[:-1])
+        assert metrics.stats()["errors"] == {
+            "decode": {"Bolt11BadBech32StringException": 1}
+        }
+        assert events[0][1] == {}
+        assert isinstance(events[0][3], Bolt11BadBech32StringException)
+
+    def test_encode(self, recorded):
+        metrics, _ = recorded
+        invoice = Bolt11Invoice()
+        invoice.payment_hash = bytes(32)  # type: ignore
+        invoice.tags = [("d", "metrics")]  # type: ignore
+        lnencode(invoice, PRIVKEY)
+        stats = metrics.stats()
+        assert list(stats["seconds"]["encode"]) == ["tags", "signature", "bech32"]
+        assert stats["tags"] == {"p": 1, "d": 1}
+
+    def test_cache(self, recorded):
+        metrics, _ = recorded
+        cache = DecodeCache(clock=lambda: 1496314658)
+        cache.decode(payment_request)
+        cache.decode(payment_request)
+        counters = metrics.stats()["counters"]
+        assert counters["decode_cache_hit"] == 1
+        assert counters["decode_cache_miss"] == 1
+
+    def test_clear(self, recorded):
+        metrics, _ = recorded
+        decode(payment_request)
+        metrics.clear()
+        assert metrics.stats()["calls"] == {}
@@ -0,0 +1,135 @@
+import json
+import pickle
+
+import pytest
+
+from bolt11.codec import bech32_encode
+from bolt11.decode import decode
+from bolt11.encode import InvoiceSigner, encode_data
+from bolt11.helpers import int_to_u5, tagged, tagged_bytes
+from bolt11.models import INVOICE_FIELDS, Bolt11Invoice, Route, RouteHintTable
+from tests.conftest import PRIVKEY
+
+payment_request = (
+    "lnbc1pvjluezsp5zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zygspp5qqqsyqcyq5rqwzqfqqqsyqcyq5rqwzqfqqqs"
+    "yqcyq5rqwzqfqypqdpl2pkx2ctnv5sxxmmwwd5kgetjypeh2ursdae8g6twvus8g6rfwvs8qun0dfjkxaq9qrsgq357wnc5r2ueh7ck6q9"
+    "3dj32dlqnls087fxdwk8qakdyafkq3yap9us6v52vjjsrvywa6rt52cm9r9zqt8r2t7mlcwspyetp5h2tztugp9lfyql"
+)
+
+routes_request = (
+    "lnbc20m1pvjluezsp5zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zygspp5qqqsyqcyq5rqwzqfqqqsyqcyq5rqwzqfqqqs"
+    "yqcyq5rqwzqfqypqhp58yjmdan79s6qqdhdzgynm4zwqd5d7xmw5fk98klysy043l2ahrqsfpp3qjmp7lwpagxun9pygexvgpjdc4jdj85fr9"
+    "yq20q82gphp2nflc7jtzrcazrra7wwgzxqc8u7754cdlpfrmccae92qgzqvzq2ps8pqqqqqqpqqqqq9qqqvpeuqafqxu92d8lr6fvg0r5gv0"
+    "heeeqgcrqlnm6jhphu9y00rrhy4grqszsvpcgpy9qqqqqqgqqqqq7qqzq9qrsgqdfjcdk6w3ak5pca9hwfwfh63zrrz06wwfya0ydlzpgzxk"
+    "n5xagsqz7x9j4jwe7yj7vaf2k9lqsdk45kts2fd0fkr28am0u4w95tt2nsq76cqw0"
+)
+
+
+class TestBolt11Invoice:
+    def test_no_instance_dict(self):
+        invoice = Bolt11Invoice()
+        assert not hasattr(invoice, "__dict__")
+        with pytest.raises(AttributeError):
+            invoice.nonexistent = 1  # type: ignore
+
+    def test_hex_and_raw(self):
+        invoice = Bolt11Invoice()
+        invoice.payment_hash = "00" * 31 + "01"
+        assert invoice.payment_hash_raw == bytes(31) + b"\x01"
+        invoice.payment_hash = bytes(32)
+        assert invoice.payment_hash == "00" * 32
+        assert invoice.payee is None
+        assert invoice.payee_raw is None
+
+    def test_decoded_raw(self):
+        invoice = decode(payment_request)
+        assert invoice.payment_hash_raw is not None
+        assert invoice.payment_hash_raw.hex() == invoice.payment_hash
+        assert invoice.signature_raw is not None
+        assert len(invoice.signature_raw) == 64
+
+    def test_pickle(self):
+        invoice = decode(payment_request)
+        assert str(pickle.loads(pickle.dumps(invoice))) == str(invoice)
+
+    def test_to_dict_defaults(self):
+        invoice = Bolt11Invoice()
+        data = invoice.to_dict()
+        assert tuple(data) == INVOICE_FIELDS
+        assert data["currency"] == "bc"
+        assert data["expiry"] == 1000
+        assert data["payee"] is None
+
+    def test_to_dict_routes(self):
+        invoice = decode(routes_request)
+        data = invoice.to_dict()
+        assert invoice.route_hints
+        assert data["route_hints"] == [route.to_dict() for route in invoice.route_hints]
+        assert data["route_hints"][0]["short_channel_id"] == "66051x263430x1800"
+
+    @pytest.mark.parametrize("request_", [payment_request, routes_request])
+    def test_to_json(self, request_):
+        invoice = decode(request_)
+        assert json.loads(invoice.to_json()) == invoice.to_dict()
+        assert str(invoice) == invoice.to_json()
+
+    def test_to_json_big_ints(self):
+        # amount and expiry beyond 64 bits, which orjson cannot serialize
+        addr = Bolt11Invoice()
+        addr.payment_hash = bytes(32)  # type: ignore
+        addr.tags = [("d", "coffee")]  # type: ignore
+        hrp = "lnbc9999999999999999999999999"
+        data = encode_data(addr) + tagged("x", int_to_u5(2**70, 15))
+        data += InvoiceSigner(PRIVKEY).sign(hrp.encode(), data)
+        invoice = decode(bech32_encode(hrp, data))
+        assert invoice.amount is not None and invoice.amount >= 2**64
+        assert invoice.expiry == 2**70
+        assert json.loads(invoice.to_json()) == invoice.to_dict()
+        assert str(invoice) == invoice.to_json()
+
+    def test_to_json_short_route_hint(self):
+        # an r tag shorter than one hop gives an empty route hint table
+        addr = Bolt11Invoice()
+        addr.payment_hash = bytes(32)  # type: ignore
+        addr.tags = [("d", "coffee")]  # type: ignore
+        data = encode_data(addr) + tagged_bytes("r", bytes(10))
+        data += InvoiceSigner(PRIVKEY).sign(b"lnbc", data)
+        invoice = decode(bech32_encode("lnbc", data))
+        assert invoice.route_hints is not None
+        assert len(invoice.route_hints) == 0
+        assert invoice.to_dict()["route_hints"] == []
+        assert json.loads(invoice.to_json())["route_hints"] == []
+
+
+class TestRouteHintTable:
+    def test_decoded(self):
+        table = decode(routes_request).route_hints
+        assert isinstance(table, RouteHintTable)
+        assert len(table) == 2
+        route = table[0]
+        assert route.scid == 0x0102030405060708
+        assert route.short_channel_id == "66051x263430x1800"
+        assert route.pubkey_raw == table.pubkey(0)
+        assert route.pubkey == table.pubkey(0).hex()
+        assert table[-1] == table[1]
+        assert table[:] == [table[0], table[1]]
+        with pytest.raises(IndexError):
+            table[2]  # pylint: disable=pointless-statement
+
+    def test_from_routes(self):
+        table = decode(routes_request).route_hints
+        assert table is not None
+        assert RouteHintTable(table) == table
+        assert RouteHintTable() == []
+        assert table.to_dicts() == [route.to_dict() for route in table]
+
+    def test_queries(self):
+        hops = [
+            Route(bytes([2]) + bytes([i % 3]) * 32, 1000 + i, i, i * 10, 40)
+            for i in range(30)
+        ]
+        table = RouteHintTable(hops)
+        assert table.find_scid(1007) == 7
+        assert table.find_scid(1) == -1
+        assert table.hops_from(hops[1].pubkey_raw) == list(range(1, 30, 3))
+        assert table.hops_from(bytes(33)) == []
@@ -0,0 +1,142 @@
+import pytest
+
+from bolt11.codec import CHARSET, bech32_decode, bech32_encode
+from bolt11.decode import decode
+from bolt11.result import STAGES, ErrorCode, try_decode, try_decode_many
+from tests.conftest import PAYEE, reencode, signed
+
+payment_request = (
+    "lnbc1pvjluezsp5zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zygspp5qqqsyqcyq5rqwzqfqqqsyqcyq5rqwzqfqqqs"
+    "yqcyq5rqwzqfqypqdpl2pkx2ctnv5sxxmmwwd5kgetjypeh2ursdae8g6twvus8g6rfwvs8qun0dfjkxaq9qrsgq357wnc5r2ueh7ck6q9"
+    "3dj32dlqnls087fxdwk8qakdyafkq3yap9us6v52vjjsrvywa6rt52cm9r9zqt8r2t7mlcwspyetp5h2tztugp9lfyql"
+)
+
+
+def with_signature_byte(payment_request: str, position: int, value: int) -> str:
+    def change(data):
+        data = bytearray(data)
+        data[position] = value
+        return bytes(data)
+
+    return reencode(payment_request, change)
+
+
+# (invoice, error code, offset)
+cases = [
+    (None, ErrorCode.BAD_INPUT, 0),
+    (10**12, ErrorCode.BAD_INPUT, 0),
+    (list(payment_request.encode()), ErrorCode.BAD_INPUT, 0),
+    ("lnbcé" + payment_request[5:], ErrorCode.NOT_ASCII, 4),
+    (b"lnbc\xff" + payment_request[5:].encode(), ErrorCode.NOT_ASCII, 4),
+    ("lnbc 1" + payment_request[5:], ErrorCode.UNPRINTABLE, 4),
+    ("", ErrorCode.NO_SEPARATOR, 0),
+    ("garbage", ErrorCode.NO_SEPARATOR, 0),
+    (payment_request[:10].upper() + payment_request[10:], ErrorCode.MIXED_CASE, 10),
+    ("lnbc1qqqqqqbqqqq", ErrorCode.BAD_CHARACTER, 11),
+    (
+        payment_request[:-1] + CHARSET[(CHARSET.find(payment_request[-1]) + 1) % 32],
+        ErrorCode.BAD_CHECKSUM,
+        len(payment_request) - 6,
+    ),
+    ("xx" + payment_request[2:], ErrorCode.BAD_CHECKSUM, len(payment_request) - 6),
+    (
+        bech32_encode("xxbc", bech32_decode(payment_request)[1]),
+        ErrorCode.NOT_LIGHTNING,
+        0,
+    ),
+    (
+        bech32_encode("lnbc2500x", bech32_decode(payment_request)[1]),
+        ErrorCode.BAD_AMOUNT,
+        4,
+    ),
+    (
+        reencode(payment_request, lambda data: data[:7] + data[-100:]),
+        ErrorCode.TOO_SHORT,
+        5 + 107,
+    ),
+    (
+        reencode(
+            payment_request, lambda data: data[:7] + bytes([1, 31, 31]) + data[-104:]
+        ),
+        ErrorCode.MALFORMED_TAG,
+        5 + 7,
+    ),
+    (
+        reencode(
+            signed("valid", payee=True),
+            lambda data: data[:-105] + bytes([data[-105] ^ 16]) + data[-104:],
+        ),
+        ErrorCode.BAD_SIGNATURE,
+        len(signed("valid", payee=True)) - 6 - 104,
+    ),
+    (
+        with_signature_byte(payment_request, -1, 8),
+        ErrorCode.RECOVERY_FAILED,
+        len(payment_request) - 6 - 104,
+    ),
+]
+
+
+class TestTryDecode:
+    @pytest.mark.parametrize(
+        "invoice",
+        [payment_request, payment_request.upper(), payment_request.encode()],
+    )
+    def test_ok(self, invoice):
+        result = try_decode(invoice)
+        assert result.ok
+        assert (result.error, result.stage, result.offset) == (None, None, None)
+        assert result.invoice.to_dict() == decode(invoice).to_dict()
+
+    def test_payee_tag(self):
+        result = try_decode(signed("valid", payee=True))
+        assert result.ok
+        assert result.invoice.payee == PAYEE
+
+    @pytest.mark.parametrize("invoice, error, offset", cases)
+    def test_errors(self, invoice, error, offset):
+        result = try_decode(invoice)
+        assert not result.ok
+        assert result.invoice is None
+        assert (result.error, result.offset) == (error, offset)
+        assert result.stage == STAGES[error]
+        with pytest.raises(Exception):
+            decode(invoice)
+
+    def test_bad_tag(self):
+        # description that is not utf-8
+        invoice = reencode(
+            payment_request,
+            lambda data: data[:7] + bytes([13, 0, 2, 31, 31]) + data[7:],
+        )
+        result = try_decode(invoice)
+        assert (result.error, result.stage) == (ErrorCode.BAD_TAG, "tags")
+        assert result.offset == len("lnbc1") + 7
+
+    @pytest.mark.parametrize(
+        "tag",
+        [
+            # description that is not utf-8
+            bytes([13, 0, 2, 31, 31]),
+            # empty fallback address
+            bytes([9, 0, 0]),
+        ],
+    )
+    def test_bad_tag_offset(self, tag):
+        # the bad tag follows the valid ones, before the signature
+        invoice = reencode(
+            payment_request, lambda data: data[:-104] + tag + data[-104:]
+        )
+        result = try_decode(invoice)
+        assert (result.error, result.stage) == (ErrorCode.BAD_TAG, "tags")
+        assert result.offset == len(invoice) - 6 - 104 - len(tag)
+        assert invoice[result.offset] == CHARSET[tag[0]]
+
+    def test_error_codes_are_strings(self):
+        assert ErrorCode.BAD_CHECKSUM == "bad_checksum"
+        assert set(STAGES) == set(ErrorCode)
+
+    def test_many(self):
+        results = try_decode_many([payment_request, "garbage", payment_request])
+        assert [result.ok for result in results] == [True, False, True]
+        assert results[1].error == ErrorCode.NO_SEPARATOR
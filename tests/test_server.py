@@ -0,0 +1,298 @@
+import json
+import os
+import socket
+import struct
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from bolt11 import server
+from bolt11.decode import decode
+from bolt11.server import (
+    MAX_REQUEST,
+    MAX_RESTART_DELAY,
+    handle_request,
+    is_loopback,
+    serve_connection,
+)
+from tests.conftest import PAYEE, PRIVKEY
+
+payment_request = (
+    "lnbc1pvjluezsp5zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zygspp5qqqsyqcyq5rqwzqfqqqsyqcyq5rqwzqfqqqs"
+    "yqcyq5rqwzqfqypqdpl2pkx2ctnv5sxxmmwwd5kgetjypeh2ursdae8g6twvus8g6rfwvs8qun0dfjkxaq9qrsgq357wnc5r2ueh7ck6q9"
+    "3dj32dlqnls087fxdwk8qakdyafkq3yap9us6v52vjjsrvywa6rt52cm9r9zqt8r2t7mlcwspyetp5h2tztugp9lfyql"
+)
+encode_request = {
+    "op": "encode",
+    "id": 7,
+    "amount": 250_000_000,
+    "date": 1496314658,
+    "payment_hash": "0001020304050607080900010203040506070809000102030405060708090102",
+    "tags": [
+        ["d", "1 cup coffee"],
+        ["x", 60],
+        ["n", PAYEE],
+        [
+            "r",
+            [
+                {
+                    "pubkey": PAYEE,
+                    "short_channel_id": "66051x263430x1800",
+                    "base_fee_msat": 1,
+                    "ppm_fee": 20,
+                    "cltv": 3,
+                }
+            ],
+        ],
+    ],
+}
+
+
+def request(obj) -> bytes:
+    return json.dumps(obj).encode()
+
+
+def connection(framing: str):
+    client, server = socket.socketpair()
+    thread = threading.Thread(target=serve_connection, args=(server, framing))
+    thread.start()
+    return client, thread
+
+
+def read_frames(client: socket.socket) -> list:
+    data = b""
+    while chunk := client.recv(65536):
+        data += chunk
+    frames = []
+    while data:
+        (length,) = struct.unpack(">I", data[:4])
+        frames.append(json.loads(data[4 : 4 + length]))
+        data = data[4 + length :]
+    return frames
+
+
+class TestHandleRequest:
+    def test_decode(self):
+        response = handle_request(request({"invoice": payment_request, "id": "a"}))
+        assert response == {"invoice": decode(payment_request).to_dict(), "id": "a"}
+
+    def test_bare_invoice(self):
+        response = handle_request(payment_request.encode() + b"\r\n")
+        assert response["invoice"]["payee"] == decode(payment_request).payee
+
+    def test_decode_error(self):
+        response = handle_request(request({"invoice": payment_request[:-1] + "q"}))
+        assert response == {
+            "error": "bad_checksum",
+            "stage": "bech32",
+            "offset": len(payment_request) - 6,
+        }
+
+    def test_encode(self):
+        response = handle_request(request({**encode_request, "privkey": PRIVKEY}))
+        assert response["id"] == 7
+        invoice = decode(response["payment_request"])
+        assert invoice.payee == PAYEE
+        assert invoice.payment_hash == encode_request["payment_hash"]
+        assert invoice.description == "1 cup coffee"
+        assert invoice.expiry == 60
+        assert invoice.to_dict()["route_hints"] == encode_request["tags"][3][1]
+
+    def test_encode_default_privkey(self):
+        response = handle_request(request(encode_request), privkey=PRIVKEY)
+        assert decode(response["payment_request"]).payee == PAYEE
+        response = handle_request(request(encode_request))
+        assert response["error"] == "bad_request"
+
+    def test_encode_failed(self):
+        tags = [["d", "coffee"], ["d", "tea"]]
+        response = handle_request(
+            request({**encode_request, "tags": tags}), privkey=PRIVKEY
+        )
+        assert response["error"] == "encode_failed"
+        assert response["id"] == 7
+
+    @pytest.mark.parametrize(
+        "payload",
+        [
+            b"{not json",
+            b"{}",
+            request({"op": "pay", "id": 1}),
+            request({"invoice": 50_000_000}),
+            request({"invoice": list(payment_request.encode())}),
+            request({"invoice": None}),
+        ],
+    )
+    def test_bad_request(self, payload):
+        response = handle_request(payload)
+        assert response["error"] == "bad_request"
+
+    @pytest.mark.parametrize("scid", ["-1x0x0", "16777216x0x0", "0x0x65536", "1x2"])
+    def test_bad_short_channel_id(self, scid):
+        hop = {**encode_request["tags"][3][1][0], "short_channel_id": scid}
+        tags = [["d", "coffee"], ["r", [hop]]]
+        response = handle_request(
+            request({**encode_request, "tags": tags}), privkey=PRIVKEY
+        )
+        assert response["error"] == "bad_request"
+        assert response["id"] == 7
+
+
+class TestServeConnection:
+    def test_ndjson_pipelined(self):
+        client, thread = connection("ndjson")
+        lines = [
+            payment_request.encode(),
+            b"",
+            request({"invoice": "garbage", "id": 2}),
+            request({"invoice": payment_request, "id": 3}),
+        ]
+        client.sendall(b"\n".join(lines) + b"\n")
+        client.shutdown(socket.SHUT_WR)
+        with client.makefile("rb") as rfile:
+            responses = [json.loads(line) for line in rfile]
+        thread.join()
+        assert len(responses) == 3
+        assert responses[0]["invoice"] == responses[2]["invoice"]
+        assert responses[1] == {
+            "error": "no_separator",
+            "stage": "bech32",
+            "offset": 0,
+            "id": 2,
+        }
+
+    def test_length_prefixed(self):
+        client, thread = connection("length")
+        payloads = [payment_request.encode(), request({"invoice": "x", "id": 1})]
+        client.sendall(b"".join(struct.pack(">I", len(p)) + p for p in payloads))
+        client.shutdown(socket.SHUT_WR)
+        responses = read_frames(client)
+        thread.join()
+        assert responses[0]["invoice"]["date"] == 1496314658
+        assert responses[1]["id"] == 1
+
+    def test_internal_error(self, monkeypatch):
+        def handle(payload, privkey=None):
+            if payload.strip() == b"boom":
+                raise RuntimeError("boom")
+            return handle_request(payload, privkey)
+
+        monkeypatch.setattr("bolt11.server.handle_request", handle)
+        client, thread = connection("ndjson")
+        client.sendall(b"boom\n" + payment_request.encode() + b"\n")
+        client.shutdown(socket.SHUT_WR)
+        with client.makefile("rb") as rfile:
+            responses = [json.loads(line) for line in rfile]
+        thread.join()
+        assert responses[0] == {
+            "error": "internal_error",
+            "message": "RuntimeError: boom",
+        }
+        assert responses[1]["invoice"]["date"] == 1496314658
+
+    def test_too_large(self):
+        client, thread = connection("length")
+        client.sendall(struct.pack(">I", MAX_REQUEST + 1))
+        responses = read_frames(client)
+        thread.join()
+        assert responses[0]["error"] == "bad_request"
+
+    def test_unknown_framing(self):
+        client, server = socket.socketpair()
+        with client, server, pytest.raises(ValueError):
+            serve_connection(server, "xml")
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="pre-forking needs fork()")
+class TestServe:
+    def test_prefork_unix_socket(self, tmp_path):
+        path = str(tmp_path / "bolt11.sock")
+        server = subprocess.Popen(
+            [sys.executable, "-m", "bolt11.cli", "serve", "--unix", path, "-w", "2"],
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        try:
+            assert server.stderr.readline().startswith("listening on")
+            for _ in range(3):
+                with socket.socket(socket.AF_UNIX) as client:
+                    client.connect(path)
+                    with client.makefile("rwb") as stream:
+                        for _ in range(2):
+                            stream.write(payment_request.encode() + b"\n")
+                            stream.flush()
+                            response = json.loads(stream.readline())
+                            assert response["invoice"]["date"] == 1496314658
+        finally:
+            server.terminate()
+            server.wait(10)
+        assert server.returncode == 0
+        assert not os.path.exists(path)
+
+    def test_needs_address(self):
+        result = subprocess.run(
+            [sys.executable, "-m", "bolt11.cli", "serve"],
+            capture_output=True,
+            text=True,
+        )
+        assert result.returncode == 2
+        assert "--unix or --port" in result.stderr
+
+    def test_public_host(self):
+        result = subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "bolt11.cli",
+                "serve",
+                "--host",
+                "0.0.0.0",
+                "--port",
+                "0",
+            ],
+            capture_output=True,
+            text=True,
+        )
+        assert result.returncode == 2
+        assert "--public" in result.stderr
+
+    @pytest.mark.parametrize(
+        "host, loopback",
+        [
+            ("localhost", True),
+            ("127.0.0.1", True),
+            ("::1", True),
+            ("0.0.0.0", False),
+            ("192.168.1.1", False),
+            ("example.com", False),
+        ],
+    )
+    def test_is_loopback(self, host, loopback):
+        assert is_loopback(host) is loopback
+
+    def test_restart_backoff(self, monkeypatch):
+        # a single worker that exits right after every fork
+        forked = []
+        sleeps = []
+
+        def fork():
+            forked.append(100 + len(forked))
+            return forked[-1]
+
+        def wait():
+            if len(sleeps) == 12:
+                raise KeyboardInterrupt
+            return forked[-1], 0
+
+        monkeypatch.setattr(server.os, "fork", fork)
+        monkeypatch.setattr(server.os, "wait", wait)
+        monkeypatch.setattr(server.os, "kill", lambda pid, sig: None)
+        monkeypatch.setattr(server.os, "waitpid", lambda pid, options: (pid, 0))
+        monkeypatch.setattr(server.time, "sleep", sleeps.append)
+        with socket.socket() as listener, pytest.raises(KeyboardInterrupt):
+            server._prefork(listener, lambda conn: None, 1)
+        assert sleeps[:3] == [0.1, 0.2, 0.4]
+        assert sleeps[-1] == MAX_RESTART_DELAY
+        assert len(forked) == 13
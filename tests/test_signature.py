@@ -0,0 +1,76 @@
+import pytest
+
+from bolt11.decode import decode
+from bolt11.signature import (
+    EcdsaBackend,
+    PubkeyCache,
+    available_backends,
+    get_backend,
+    set_backend,
+)
+from tests.conftest import PAYEE
+
+payment_request = (
+    "lnbc1pvjluezsp5zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zygspp5qqqsyqcyq5rqwzqfqqqsyqcyq5rqwzqfqqqs"
+    "yqcyq5rqwzqfqypqdpl2pkx2ctnv5sxxmmwwd5kgetjypeh2ursdae8g6twvus8g6rfwvs8qun0dfjkxaq9qrsgq357wnc5r2ueh7ck6q9"
+    "3dj32dlqnls087fxdwk8qakdyafkq3yap9us6v52vjjsrvywa6rt52cm9r9zqt8r2t7mlcwspyetp5h2tztugp9lfyql"
+)
+
+
+class TestSignature:
+    @pytest.fixture(autouse=True)
+    def restore_backend(self):
+        backend = get_backend()
+        yield
+        set_backend(backend)
+
+    def test_default_backend(self):
+        assert get_backend().name == available_backends()[0]
+
+    @pytest.mark.parametrize("name", available_backends())
+    def test_decode_with_backend(self, name):
+        set_backend(name)
+        assert decode(payment_request).payee == PAYEE
+
+    @pytest.mark.parametrize("name", available_backends())
+    def test_recover_and_verify(self, name):
+        backend = set_backend(name)
+        invoice = decode(payment_request)
+        signature = bytes.fromhex(invoice.signature)
+        message = b"lnbc" + b"\x00" * 32
+        pubkey = backend.recover(signature, 0, message)
+        assert backend.verify(pubkey, signature, message)
+        assert not backend.verify(pubkey, signature, message + b"\x00")
+        assert EcdsaBackend().verify(pubkey, signature, message)
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError):
+            set_backend("unknown")
+
+    @pytest.mark.parametrize("name", available_backends())
+    def test_pubkey_cache(self, name):
+        backend = set_backend(name)
+        invoice = decode(payment_request)
+        signature = bytes.fromhex(invoice.signature)
+        message = b"lnbc" + b"\x00" * 32
+        pubkey = backend.recover(signature, 0, message)
+        backend.pubkey_cache.clear()
+        for _ in range(3):
+            assert backend.verify(pubkey, signature, message)
+        assert backend.pubkey_cache.stats() == {
+            "hits": 2,
+            "misses": 1,
+            "size": 1,
+            "maxsize": 1024,
+        }
+
+    def test_pubkey_cache_eviction(self):
+        cache = PubkeyCache(maxsize=2)
+        for pubkey in (b"a", b"b", b"a", b"c"):
+            cache.get(pubkey, bytes.upper)
+        assert cache.get(b"a", bytes.upper) == b"A"
+        assert cache.hits == 2 and cache.misses == 3
+        # b was least recently used
+        cache.get(b"b", bytes.upper)
+        assert cache.misses == 4
+        assert len(cache.stats()) == 4 and cache.stats()["size"] == 2
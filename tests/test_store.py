@@ -0,0 +1,89 @@
+import pytest
+
+from bolt11.codec import bech32_decode, bech32_encode
+from bolt11.decode import decode
+from bolt11.exceptions import Bolt11SignatureVerifyException
+from bolt11.models import Bolt11Invoice
+from bolt11.store import InvoiceStore
+from tests.conftest import DATE, PAYEE, signed
+
+
+def invoice(i: int, expiry: int = 3600) -> str:
+    return signed(f"invoice {i}", expiry=expiry, payment_hash=bytes([i]) * 32)
+
+
+class TestInvoiceStore:
+    def test_add_and_duplicates(self, clock):
+        store = InvoiceStore(clock)
+        assert store.add(invoice(1))
+        assert not store.add(invoice(1, expiry=60))
+        assert store.add(decode(invoice(2)))
+        assert len(store) == 2
+        assert bytes([1]) * 32 in store
+        assert "01" * 32 in store
+        assert store.get("01" * 32).description == "invoice 1"
+        assert store.get(bytes(32)) is None
+        assert store.stats()["duplicates"] == 1
+
+    def test_duplicate_skips_signature(self, clock):
+        payment_request = signed("signed", payee=True)
+        hrp, data = bech32_decode(payment_request)
+        # same payment hash, changed description: the signature does not match
+        tampered = bech32_encode(
+            hrp, data[:-105] + bytes([data[-105] ^ 16]) + data[-104:]
+        )
+        with pytest.raises(Bolt11SignatureVerifyException):
+            InvoiceStore(clock).add(tampered)
+
+        store = InvoiceStore(clock)
+        assert store.add(payment_request)
+        assert not store.add(tampered)
+
+    def test_by_payee(self, clock):
+        store = InvoiceStore(clock)
+        for i in range(3):
+            store.add(invoice(i))
+        assert sorted(i.description for i in store.by_payee(PAYEE)) == [
+            "invoice 0",
+            "invoice 1",
+            "invoice 2",
+        ]
+        store.remove(bytes([1]) * 32)
+        assert len(store.by_payee(bytes.fromhex(PAYEE))) == 2
+        assert store.by_payee(bytes(33)) == []
+
+    def test_expiry_eviction(self, clock):
+        store = InvoiceStore(clock)
+        for i in range(10):
+            store.add(invoice(i, expiry=100 * (i + 1)))
+        assert store.next_expiry() == DATE + 100
+        clock.now = DATE + 350
+        assert store.evict() == 3
+        assert len(store) == 7
+        assert store.next_expiry() == DATE + 400
+        store.remove(bytes([3]) * 32)
+        assert store.next_expiry() == DATE + 500
+        # eviction also happens on add
+        clock.now = DATE + 800
+        assert store.add(invoice(20, expiry=1000))
+        assert len(store) == 3
+        assert store.stats()["evicted"] == 7
+        # expired before it was added
+        assert not store.add(invoice(21, expiry=10))
+        assert store.stats()["expired"] == 1
+        assert store.by_payee(PAYEE) and len(store.by_payee(PAYEE)) == 3
+
+    def test_remove_compacts_heap(self, clock):
+        store = InvoiceStore(clock)
+        for i in range(200):
+            store.add(invoice(i))
+        for i in range(190):
+            assert store.remove(bytes([i]) * 32) is not None
+        assert store.remove(bytes([0]) * 32) is None
+        assert len(store._expiry) <= 2 * len(store) + 64
+        assert store.next_expiry() == DATE + 3600
+
+    def test_no_payment_hash(self, clock):
+        store = InvoiceStore(clock)
+        with pytest.raises(ValueError):
+            store.add(Bolt11Invoice())
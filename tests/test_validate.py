@@ -0,0 +1,79 @@
+import pytest
+
+from bolt11.codec import CHARSET
+from bolt11.decode import decode
+from bolt11.validate import CHECKSUM, SIGNATURE, SYNTAX, validate
+from tests.conftest import reencode, signed
+
+payment_request = (
+    "lnbc1pvjluezsp5zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zygspp5qqqsyqcyq5rqwzqfqqqsyqcyq5rqwzqfqqqs"
+    "yqcyq5rqwzqfqypqdpl2pkx2ctnv5sxxmmwwd5kgetjypeh2ursdae8g6twvus8g6rfwvs8qun0dfjkxaq9qrsgq357wnc5r2ueh7ck6q9"
+    "3dj32dlqnls087fxdwk8qakdyafkq3yap9us6v52vjjsrvywa6rt52cm9r9zqt8r2t7mlcwspyetp5h2tztugp9lfyql"
+)
+
+
+# (invoice, highest level it passes)
+cases = [
+    (payment_request, SIGNATURE),
+    (payment_request.upper(), SIGNATURE),
+    (payment_request.encode(), SIGNATURE),
+    (memoryview(payment_request.encode()), SIGNATURE),
+    ("", 0),
+    ("garbage", 0),
+    ("lnbc1" + "q" * 10_000, CHECKSUM - 1),
+    ("ln" + "1" * 10_000, 0),
+    ("lnbcé" + payment_request[5:], 0),
+    (payment_request[:10].upper() + payment_request[10:], 0),
+    # not ln
+    ("xx" + payment_request[2:], 0),
+    # too short for timestamp and signature
+    (reencode(payment_request, lambda data: data[:7] + data[-100:]), 0),
+    # checksum
+    (
+        payment_request[:-1] + CHARSET[(CHARSET.find(payment_request[-1]) + 1) % 32],
+        SYNTAX,
+    ),
+    # tag length exceeding the data
+    (
+        reencode(
+            payment_request, lambda data: data[:7] + bytes([1, 31, 31]) + data[-104:]
+        ),
+        SYNTAX,
+    ),
+    # description changed, the signature no longer matches the payee
+    (
+        reencode(
+            signed("valid", payee=True),
+            lambda data: data[:-105] + bytes([data[-105] ^ 16]) + data[-104:],
+        ),
+        CHECKSUM,
+    ),
+    # invalid multiplier
+    (
+        "lnbc2500x1pvjluezpp5qqqsyqcyq5rqwzqfqqqsyqcyq5rqwzqfqqqsyqcyq5rqwzqfqypqdq5xysxxatsyp3k7enxv4jsxqzpusp5zyg"
+        "3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zyg3zygs9qrsgqrrzc4cvfue4zp3hggxp47ag7xnrlr8vgcmkjxk3j5jqethnumgk"
+        "pqp23z9jclu3v0a7e0aruz366e9wqdykw6dxhdzcjjhldxq0w6wgqcnu43j",
+        CHECKSUM,
+    ),
+    (None, 0),
+]
+
+
+class TestValidate:
+    @pytest.mark.parametrize("invoice, passes", cases)
+    def test_levels(self, invoice, passes):
+        for level in (SYNTAX, CHECKSUM, SIGNATURE):
+            assert validate(invoice, level=level) == (level <= passes)
+
+    @pytest.mark.parametrize("invoice", [invoice for invoice, _ in cases])
+    def test_signature_matches_decode(self, invoice):
+        try:
+            decode(invoice)
+        except Exception:  # pylint: disable=broad-except
+            assert not validate(invoice)
+        else:
+            assert validate(invoice)
+
+    def test_unknown_level(self):
+        with pytest.raises(ValueError):
+            validate(payment_request, level=4)